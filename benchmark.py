@@ -0,0 +1,639 @@
+"""Micro-benchmarks for the steganography engines.
+
+Run from the repository root, e.g. ``python benchmark.py reconstruct``.
+Checks that the fast paths match the code they replaced live in tests/
+(``python -m pytest``); benchmarks that need real video files still verify
+their output before reporting any timings.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from stego.dct import (BlockDCT, embed_frame_blocks, embed_frame_full,
+                       embed_video, reconstruct_image)
+from stego.framecache import FrameCache
+from stego.frameindex import load_index
+from stego.header import read_header
+from stego.kernels import FrameRing, LSBKernel
+from stego.payload import bytes_to_symbols, symbols_to_bytes
+from stego.lsb import Steganography
+from stego import dct, quality, remux, timing
+from tests.reference import (embed_frame_full_loop, embed_lsb_loop, extract_lsb_loop,
+                             reconstruct_image_loop)
+from stego.service import JobService
+from stego.codecs import CODECS, is_lossless
+from stego.compression import available as compression_methods
+from stego.video import FrameReader
+from stego.postprocess import Bilateral, CLAHE, GaussianBlur, PostProcessor
+from stego.permutation import KeyedPermutation, legacy_permutation, permutation
+
+
+def report(name, legacy, fast):
+    print(f"{name}: legacy {legacy * 1000:.2f} ms, fast {fast * 1000:.3f} ms "
+          f"({legacy / fast:.0f}x)")
+
+
+def bench_reconstruct(args):
+    rng = np.random.default_rng(0)
+    # Spread values past both clip limits so clipping is exercised too
+    block = (rng.random((64, 64), dtype=np.float32) * 1.4 - 0.2).astype(np.float32)
+
+    legacy = min(timeit.repeat(lambda: reconstruct_image_loop(block), number=1, repeat=3))
+    fast = min(timeit.repeat(lambda: reconstruct_image(block), number=20, repeat=5)) / 20
+    report("reconstruct 512x512", legacy, fast)
+
+
+def bench_permutation(args):
+    n = 1_000_000
+    keyed = KeyedPermutation(n, 42)
+    if keyed.take(np.arange(10_000)).tolist() != [keyed[k] for k in range(10_000)]:
+        raise SystemExit("KeyedPermutation.take differs from scalar lookups")
+
+    legacy = min(timeit.repeat(lambda: legacy_permutation(n, 42), number=1, repeat=3))
+    fast = min(timeit.repeat(lambda: permutation(n, 42), number=5, repeat=3)) / 5
+    report(f"full permutation n={n}", legacy, fast)
+
+    single = min(timeit.repeat(lambda: keyed[0], number=1000, repeat=3)) / 1000
+    report(f"slot 0 of n={n}", legacy, single)
+
+
+def bench_dct_embed(args):
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    secret = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+
+    legacy = min(timeit.repeat(lambda: [embed_frame_full_loop(frame, row) for row in secret],
+                               number=1, repeat=3))
+    fast = min(timeit.repeat(lambda: [embed_frame_full(frame, row) for row in secret],
+                             number=1, repeat=3))
+    report("64-frame full-plane embed 640x480", legacy, fast)
+
+
+def bench_block_dct(args):
+    rng = np.random.default_rng(0)
+    transform = BlockDCT(8)
+    row = rng.integers(0, 256, (64, 3), dtype=np.uint8)
+    for name, (width, height) in (('480p', (854, 480)), ('1080p', (1920, 1080)),
+                                  ('4K', (3840, 2160))):
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        legacy = min(timeit.repeat(lambda: embed_frame_full(frame, row), number=3, repeat=3)) / 3
+        fast = min(timeit.repeat(lambda: embed_frame_blocks(frame.copy(), row, transform),
+                                 number=20, repeat=3)) / 20
+        report(f"embed frame {name}", legacy, fast)
+
+
+def write_synthetic_video(path, size=(640, 480), frames=150, fps=30):
+    """Write a deterministic moving-gradient test video and return its path."""
+    width, height = size
+    x = np.arange(width, dtype=np.uint16)[None, :]
+    y = np.arange(height, dtype=np.uint16)[:, None]
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    for index in range(frames):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:, :, 0] = (x + index * 3) % 256
+        frame[:, :, 1] = (y + index * 2) % 256
+        frame[:, :, 2] = (x + y + index) % 256
+        out.write(frame)
+    out.release()
+    return path
+
+
+def write_synthetic_image(path, size=(640, 480)):
+    rng = np.random.default_rng(1)
+    cv2.imwrite(path, rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8))
+    return path
+
+
+def bench_pipeline(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=300)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'))
+        serial_out = os.path.join(tmp, 'serial.mp4')
+        steg = Steganography()
+
+        # The single-threaded loop Steganography.embed_data used to run
+        start = time.perf_counter()
+        cap = cv2.VideoCapture(video)
+        secret_img = cv2.resize(cv2.imread(secret), steg.frame_size)
+        kernel = LSBKernel(steg.bits_per_channel, secret_img.shape)
+        out = cv2.VideoWriter(serial_out, cv2.VideoWriter_fourcc(*'mp4v'),
+                              int(cap.get(cv2.CAP_PROP_FPS)), steg.frame_size)
+        index = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame = cv2.resize(frame, steg.frame_size)
+            if index == 0:
+                kernel.embed(frame, kernel.secret_bits(secret_img))
+            out.write(frame)
+            index += 1
+        cap.release()
+        out.release()
+        serial = time.perf_counter() - start
+
+        steg.embed_data(video, secret, os.path.join(tmp, 'pipelined.mp4'), lambda value: None)
+        stats = steg.last_stats
+        print(f"embed 300 frames 640x480: serial {index / serial:.0f} fps, "
+              f"pipelined {stats.fps:.0f} fps ({serial / stats.seconds:.2f}x)")
+
+
+def bench_smart_render(args):
+    if not remux.available():
+        print("smart-render: skipped, ffmpeg/ffprobe not found")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=1800)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'))
+        steg = Steganography()
+
+        start = time.perf_counter()
+        steg.embed_data(video, secret, os.path.join(tmp, 'full.mp4'), lambda value: None)
+        full = time.perf_counter() - start
+
+        steg.smart_render = True
+        start = time.perf_counter()
+        steg.embed_data(video, secret, os.path.join(tmp, 'smart.mp4'), lambda value: None)
+        smart = time.perf_counter() - start
+        report("embed 1800 frames, full vs smart render", full, smart)
+
+
+def bench_codecs(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=150)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'))
+        steg = Steganography()
+
+        print(f"{'codec':<8}{'lossless':>10}{'fps':>10}{'size (MB)':>12}{'bit-exact':>12}")
+        for codec, (_, extension, _) in CODECS.items():
+            output = os.path.join(tmp, 'stego_' + codec + extension)
+            steg.codec = codec
+            steg.embed_data(video, secret, output, lambda value: None)
+
+            # Check whether the embedded bits survived the round trip
+            kernel = LSBKernel(steg.bits_per_channel, (steg.frame_size[1], steg.frame_size[0], 3))
+            expected = kernel.embed(cv2.resize(cv2.VideoCapture(video).read()[1], steg.frame_size),
+                                    kernel.secret_bits(cv2.resize(cv2.imread(secret), steg.frame_size)))
+            written = cv2.VideoCapture(output).read()[1]
+            exact = written is not None and np.array_equal(written, expected)
+
+            print(f"{codec:<8}{str(is_lossless(output)):>10}{steg.last_stats.fps:>10.0f}"
+                  f"{os.path.getsize(output) / 1e6:>12.2f}{str(exact):>12}")
+
+
+def bench_multi_frame(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=130)
+        steg = Steganography()
+        steg.use_header = True
+        steg.codec = 'ffv1'
+        steg.shuffle_seed = 7
+
+        for megabytes in (1, 10, 100):
+            side = int((megabytes * 1e6 / 3) ** 0.5)
+            secret = write_synthetic_image(os.path.join(tmp, f'secret{megabytes}.png'), (side, side))
+            output = os.path.join(tmp, f'stego{megabytes}.mkv')
+
+            start = time.perf_counter()
+            steg.embed_data(video, secret, output, lambda value: None)
+            embed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            steg.extract_data(output, os.path.join(tmp, f'out{megabytes}.png'), lambda value: None)
+            extract = time.perf_counter() - start
+
+            size = side * side * 3 / 1e6
+            print(f"{megabytes:>4} MB payload: embed {size / embed:.1f} MB/s, "
+                  f"extract {size / extract:.1f} MB/s ({steg.extract_workers} workers)")
+
+
+def bench_kernels(args):
+    rng = np.random.default_rng(0)
+    shape = (480, 640, 3)
+    cover = rng.integers(0, 256, shape, dtype=np.uint8)
+    secret = rng.integers(0, 256, shape, dtype=np.uint8)
+
+    # Steady state: 100 frames through the ring and kernel
+    kernel = LSBKernel(6, shape)
+    secret_bits = kernel.secret_bits(secret)
+    ring = FrameRing(shape, 4)
+    extracted = np.empty(shape, dtype=np.uint8)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(100):
+        frame = ring.next()
+        np.copyto(frame, cover)
+        kernel.extract(kernel.embed(frame, secret_bits), out=extracted)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"kernels: {max(current - before, 0)} bytes retained, {peak - before} bytes peak over 100 frames")
+
+    frame = cover.copy()
+    legacy = timeit.timeit(lambda: extract_lsb_loop(embed_lsb_loop(frame, secret, 6), 6), number=20) / 20
+    fast = timeit.timeit(lambda: kernel.extract(kernel.embed(frame, secret_bits), out=extracted),
+                         number=20) / 20
+    report("embed+extract 640x480 frame", legacy, fast)
+
+
+def bench_native(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'), (800, 600))
+        print(f"{'source':<11}{'forced ms/frame':>17}{'native ms/frame':>17}{'capacity':>14}")
+        for size in ((640, 480), (1280, 720), (1920, 1080)):
+            video = write_synthetic_video(os.path.join(tmp, f'cover{size[1]}.mp4'), size, frames=90)
+            timings = []
+            for frame_size in ((640, 480), None):
+                steg = Steganography(frame_size=frame_size)
+                steg.codec = 'ffv1'
+                output = os.path.join(tmp, f'stego{size[1]}.mkv')
+                steg.embed_data(video, secret, output, lambda value: None)
+                timings.append(steg.last_stats.seconds / steg.last_stats.frames * 1000)
+            print(f"{size[0]}x{size[1]:<6}{timings[0]:>17.2f}{timings[1]:>17.2f}"
+                  f"{size[0] * size[1] / (640 * 480):>13.1f}x")
+
+
+def bench_timing(args):
+    def step():
+        with timing.stage(timing.DECODE):
+            pass
+
+    disabled = timeit.timeit(step, number=100000) / 100000
+    with timing.instrument():
+        enabled = timeit.timeit(step, number=100000) / 100000
+    print(f"timing: {disabled * 1e9:.0f} ns per stage disabled, {enabled * 1e9:.0f} ns enabled")
+
+    # Where a real embed spends its time
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=150)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'))
+        with timing.instrument() as timer:
+            Steganography().embed_data(video, secret, os.path.join(tmp, 'stego.mp4'), lambda value: None)
+        for name, entry in sorted(timer.summary().items(), key=lambda item: -item[1]['total']):
+            print(f"  {name:<12}{entry['count']:>6} calls{entry['total'] * 1000:>10.1f} ms"
+                  f"{entry['p95'] * 1000:>9.2f} ms p95")
+
+
+def bench_quality(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=150)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'))
+
+        outputs = []
+        for bits in (2, 4, 6, 8):
+            steg = Steganography(bits_per_channel=bits)
+            steg.codec = 'ffv1'
+            output = os.path.join(tmp, f'lsb{bits}.mkv')
+            steg.embed_data(video, secret, output, lambda value: None)
+            outputs.append((f'lsb-{bits}', output, secret, bits))
+        output = os.path.join(tmp, 'dct.mkv')
+        embed_video(video, secret, output, codec='ffv1')
+        outputs.append(('dct', output, None, 6))
+
+        print(f"{'engine':<8}{'PSNR f0':>9}{'PSNR mean':>11}{'SSIM min':>10}{'BER':>11}{'fps':>8}")
+        for name, output, payload_secret, bits in outputs:
+            start = time.perf_counter()
+            rows = quality.analyze(video, output, workers=1, secret_path=payload_secret,
+                                   bits_per_channel=bits)
+            fps = len(rows) / (time.perf_counter() - start)
+            summary = quality.summarize(rows)
+            ber = f"{summary['ber']:.2e}" if summary['ber'] is not None else '-'
+            print(f"{name:<8}{rows[0]['psnr']:>9.2f}{summary['psnr_mean']:>11.2f}"
+                  f"{summary['ssim_min']:>10.4f}{ber:>11}{fps:>8.0f}")
+
+
+# The clean-up main.py ran on every extraction, building CLAHE each time
+def postprocess_legacy(extracted_img):
+    lab = cv2.cvtColor(extracted_img, cv2.COLOR_BGR2LAB)
+    l, a, b = cv2.split(lab)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    l = clahe.apply(l)
+    lab = cv2.merge((l,a,b))
+    extracted_img = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+    return cv2.bilateralFilter(extracted_img, 5, 75, 75)
+
+
+def bench_postprocess(args):
+    image = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    processor = PostProcessor([('clahe', CLAHE()), ('bilateral', Bilateral())])
+    if not np.array_equal(processor(image), postprocess_legacy(image)):
+        raise SystemExit("PostProcessor output differs from the legacy chain")
+
+    legacy = timeit.timeit(lambda: postprocess_legacy(image), number=50) / 50
+    fast = timeit.timeit(lambda: processor(image), number=50) / 50
+    report("clahe+bilateral 640x480", legacy, fast)
+    for name, entry in processor.report().items():
+        print(f"  {name:<10}{entry['mean'] * 1000:>8.2f} ms/image")
+
+    processor = PostProcessor([('gaussian', GaussianBlur()), ('clahe', CLAHE())], disabled=['gaussian'])
+    fast = timeit.timeit(lambda: processor(image), number=50) / 50
+    print(f"  clahe only (gaussian disabled){fast * 1000:>8.2f} ms/image")
+
+    # A verified header checksum skips the chain altogether
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=30)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'), (320, 240))
+        steg = Steganography()
+        steg.use_header = True
+        steg.codec = 'ffv1'
+        steg.embed_data(video, secret, os.path.join(tmp, 'stego.mkv'), lambda value: None)
+        steg.postprocessor = PostProcessor([('clahe', CLAHE()), ('bilateral', Bilateral())])
+        steg.extract_data(os.path.join(tmp, 'stego.mkv'), os.path.join(tmp, 'out.png'), lambda value: None)
+        print(f"  verified extraction: checksum ok={steg.last_checksum_ok}, "
+              f"stages run={sum(steg.postprocessor.counts.values())}")
+
+
+def bench_payload(args):
+    data = np.random.default_rng(0).integers(0, 256, 16 * 2 ** 20, dtype=np.uint8).tobytes()
+    megabytes = len(data) / 2 ** 20
+    for bits in (1, 2, 3, 4, 5, 6, 7, 8):
+        symbols = bytes_to_symbols(data, bits)
+        pack = timeit.timeit(lambda: bytes_to_symbols(data, bits), number=3) / 3
+        unpack = timeit.timeit(lambda: symbols_to_bytes(symbols, bits, len(data)), number=3) / 3
+        print(f"payload {bits} bits: to symbols {megabytes / pack:.0f} MB/s, "
+              f"to bytes {megabytes / unpack:.0f} MB/s")
+
+    # End to end through both engines on a lossless stream
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=60)
+        secret = data[:2 * 2 ** 20]
+        steg = Steganography(bits_per_channel=4)
+        steg.codec = 'ffv1'
+        output = os.path.join(tmp, 'lsb.mkv')
+        start = time.perf_counter()
+        steg.embed_bytes(video, secret, output)
+        embed = time.perf_counter() - start
+        start = time.perf_counter()
+        exact = steg.extract_bytes(output) == secret and steg.last_checksum_ok
+        extract = time.perf_counter() - start
+        print(f"lsb 2 MB: embed {2 / embed:.1f} MB/s, extract {2 / extract:.1f} MB/s, exact={exact}")
+
+        secret = data[:2 ** 18]
+        output = os.path.join(tmp, 'dct.mkv')
+        start = time.perf_counter()
+        dct.embed_bytes(video, secret, output)
+        embed = time.perf_counter() - start
+        start = time.perf_counter()
+        recovered, checksum_ok = dct.extract_bytes(output)
+        extract = time.perf_counter() - start
+        print(f"dct 256 KB: embed {0.25 / embed:.2f} MB/s, extract {0.25 / extract:.2f} MB/s, "
+              f"exact={recovered == secret and checksum_ok}")
+
+
+def bench_compression(args):
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, 'README.md'), 'rb') as f:
+        text = f.read() * 400
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=60)
+        payloads = [('lena.png', os.path.join(here, 'lena.png'), None),
+                    ('README x400', None, text)]
+
+        print(f"{'payload':<12}{'method':<7}{'bytes':>11}{'carriers':>10}{'embed s':>9}{'extract s':>11}")
+        for name, image_path, data in payloads:
+            for method in [None] + compression_methods():
+                steg = Steganography(bits_per_channel=1)
+                steg.use_header = True
+                steg.codec = 'ffv1'
+                steg.compression = method
+                output = os.path.join(tmp, 'stego.mkv')
+
+                start = time.perf_counter()
+                if data is None:
+                    steg.embed_data(video, image_path, output, lambda value: None)
+                else:
+                    steg.embed_bytes(video, data, output)
+                embed = time.perf_counter() - start
+
+                start = time.perf_counter()
+                if data is None:
+                    steg.extract_data(output, os.path.join(tmp, 'out.png'), lambda value: None)
+                else:
+                    steg.extract_bytes(output)
+                extract = time.perf_counter() - start
+
+                header = read_header(cv2.VideoCapture(output).read()[1])
+                print(f"{name:<12}{method or 'none':<7}{header.payload_length:>11}"
+                      f"{header.frame_count:>10}{embed:>9.2f}{extract:>11.2f}")
+
+
+def bench_frame_cache(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), (1280, 720), frames=300)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'))
+        cache = FrameCache(os.path.join(tmp, 'cache'), budget=2 * 1024 ** 3)
+
+        print(f"{'bits':<6}{'decoded s':>11}{'cached s':>10}")
+        for run, bits in enumerate((2, 4, 6, 8)):
+            timings = []
+            for frame_cache in (None, cache):
+                steg = Steganography(bits_per_channel=bits)
+                steg.codec = 'ffv1'
+                steg.frame_cache = frame_cache
+                output = os.path.join(tmp, 'stego.mkv')
+                start = time.perf_counter()
+                steg.embed_data(video, secret, output, lambda value: None)
+                timings.append(time.perf_counter() - start)
+
+            note = "  (populates the cache)" if run == 0 else ""
+            print(f"{bits:<6}{timings[0]:>11.2f}{timings[1]:>10.2f}{note}")
+        print(f"cache holds {cache.size() / 1e6:.0f} MB")
+
+
+def bench_frame_index(args):
+    if not remux.available():
+        print("frame-index: skipped, ffprobe not found")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), frames=900)
+        start = time.perf_counter()
+        index = load_index(video)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        load_index(video)
+        reuse = time.perf_counter() - start
+        print(f"frame-index: built in {build * 1000:.0f} ms, reloaded in {reuse * 1000:.1f} ms, "
+              f"{len(index.keyframes)} keyframes in {index.frames} frames")
+
+        targets = np.random.default_rng(0).integers(0, index.frames, 50).tolist()
+        timings = []
+        for indexed in (False, True):
+            with FrameReader(video, indexed=indexed) as reader:
+                start = time.perf_counter()
+                for k in targets:
+                    reader.read(k)
+                timings.append(time.perf_counter() - start)
+        report("50 random frame reads", *timings)
+
+
+def bench_sharding(args):
+    if not remux.available():
+        print("sharding: skipped, ffmpeg not found")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), (1280, 720), frames=1200)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'), (1280, 720))
+        steg = Steganography()
+        steg.codec = 'ffv1'
+        steg.frame_size = None
+        steg.use_header = True
+        serial = os.path.join(tmp, 'serial.mkv')
+        start = time.perf_counter()
+        steg.embed_data(video, secret, serial, lambda value: None)
+        print(f"{'workers':<9}{'seconds':>9}{'fps':>8}")
+        print(f"{'serial':<9}{time.perf_counter() - start:>9.2f}{steg.last_stats.fps:>8.1f}")
+
+        for workers in (1, 2, 4, 8, 16):
+            steg.shard_workers = workers
+            output = os.path.join(tmp, f'sharded{workers}.mkv')
+            start = time.perf_counter()
+            steg.embed_data(video, secret, output, lambda value: None)
+            print(f"{workers:<9}{time.perf_counter() - start:>9.2f}{steg.last_stats.fps:>8.1f}")
+
+
+async def _http(socket_path, method, path, data=None):
+    """Minimal HTTP client for the job service; returns (status code, body lines)."""
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    body = json.dumps(data).encode() if data is not None else b''
+    writer.write(f'{method} {path} HTTP/1.1\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), payload
+
+
+def bench_service(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        video = write_synthetic_video(os.path.join(tmp, 'cover.mp4'), (320, 240), frames=30)
+        secret = write_synthetic_image(os.path.join(tmp, 'secret.png'), (320, 240))
+        jobs = [{'video': video, 'secret': secret, 'output': os.path.join(tmp, f'out{n}.mp4')}
+                for n in range(8)]
+
+        # A fresh interpreter per job, as running a script per job does
+        start = time.perf_counter()
+        for number, job in enumerate(jobs):
+            manifest = os.path.join(tmp, f'job{number}.json')
+            with open(manifest, 'w') as f:
+                json.dump([job], f)
+            subprocess.run([sys.executable, '-m', 'stego', 'batch', manifest, '--workers', '1'],
+                           check=True, stdout=subprocess.DEVNULL)
+        per_process = time.perf_counter() - start
+
+        async def run():
+            socket_path = os.path.join(tmp, 'stego.sock')
+            service = JobService(workers=1)
+            await service.start()
+            server = await asyncio.start_unix_server(service.handle, socket_path)
+            try:
+                # The first job starts the worker process; leave it out of the timing
+                await _http(socket_path, 'POST', '/jobs', jobs[0])
+                await _http(socket_path, 'GET', '/jobs/1/events')
+                start = time.perf_counter()
+                for job in jobs:
+                    code, body = await _http(socket_path, 'POST', '/jobs', job)
+                    if code != 202:
+                        raise SystemExit(f"Submission refused: {body.decode()}")
+                _, events = await _http(socket_path, 'GET', f'/jobs/{json.loads(body)["id"]}/events')
+                # Strip the chunk framing and keep the JSON lines
+                events = [json.loads(line) for line in events.split(b'\r\n') if line.startswith(b'{')]
+                seconds = time.perf_counter() - start
+                _, status = await _http(socket_path, 'GET', '/status')
+                return seconds, events, json.loads(status)
+            finally:
+                server.close()
+                service.close()
+
+        service_seconds, events, status = asyncio.run(run())
+        if events[-1]['event'] != 'ok' or status['completed']['ok'] != len(jobs) + 1:
+            raise SystemExit(f"Service jobs failed: {status}")
+        report(f"{len(jobs)} embeds, process per job vs service", per_process, service_seconds)
+        print(f"progress events for the last job: {sum(event['event'] == 'progress' for event in events)}")
+        for name, figures in status['latency'].items():
+            print(f"{name:<14} mean {figures['mean']:.3f}s  p95 {figures['p95']:.3f}s")
+
+
+def import_times(statement):
+    """Run `statement` in a fresh interpreter under -X importtime; returns {module: cumulative us}."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=root,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"{statement!r} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+# Modules a headless caller imports (tests/test_imports.py checks what they load)
+HEADLESS = ('stego.cli', 'stego.service', 'stego.lsb', 'stego.dct')
+
+
+def bench_imports(args):
+    print(f"{'module':<16}{'cold import ms':>15}")
+    for module in HEADLESS:
+        times = import_times(f'import {module}')
+        print(f"{module:<16}{times[module] / 1000:>15.1f}")
+
+    # The GUI scripts import without opening a window
+    try:
+        import tkinter  # noqa: F401
+    except ImportError:
+        print("GUI scripts: skipped, tkinter not installed")
+        return
+    for script in ('embed3', 'extract_6'):
+        times = import_times(f'import tkinter, {script}')
+        print(f"{script:<16}{times[script] / 1000:>15.1f}")
+
+
+BENCHMARKS = {
+    'reconstruct': bench_reconstruct,
+    'permutation': bench_permutation,
+    'dct-embed': bench_dct_embed,
+    'block-dct': bench_block_dct,
+    'pipeline': bench_pipeline,
+    'smart-render': bench_smart_render,
+    'codecs': bench_codecs,
+    'multi-frame': bench_multi_frame,
+    'kernels': bench_kernels,
+    'native': bench_native,
+    'timing': bench_timing,
+    'quality': bench_quality,
+    'postprocess': bench_postprocess,
+    'payload': bench_payload,
+    'compression': bench_compression,
+    'frame-cache': bench_frame_cache,
+    'frame-index': bench_frame_index,
+    'sharding': bench_sharding,
+    'service': bench_service,
+    'imports': bench_imports,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help="benchmarks to run (default: all): " + ", ".join(BENCHMARKS))
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmark: " + ", ".join(unknown))
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name](args)
+
+
+if __name__ == "__main__":
+    main()
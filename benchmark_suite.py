@@ -0,0 +1,215 @@
+"""End-to-end benchmark suite for the steganography engines.
+
+Generates deterministic synthetic cover videos locally, then times every
+engine on each of them and writes one JSON record per case:
+
+    python benchmark_suite.py run --output results.json
+    python benchmark_suite.py compare baseline.json results.json
+
+`run` covers Steganography.embed_data/extract_data at each bit depth offered
+by the GUI's quality dropdown, and the DCT engine behind
+embed3.embed_data_in_video and extract_6.extract_data_from_video (called
+through stego.dct, without the scripts' message boxes).
+Each case runs in a fresh worker process so its peak RSS is its own.
+
+`compare` matches cases by id and exits with status 1 if any got slower, or
+used more memory, than the baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from stego.codecs import CODECS, open_writer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Bit depths offered by the GUI's quality dropdown
+GUI_BITS = (2, 3, 4, 5, 6, 8)
+RESOLUTIONS = ('640x480', '1280x720', '1920x1080')
+LENGTHS = (30, 150)
+SUITE_CODECS = ('mp4v', 'ffv1')
+
+
+def synthetic_video(path, size, frames, codec, fps=30):
+    """Write a deterministic cover video: a drifting gradient with seeded noise."""
+    width, height = size
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 32, (height, width, 3), dtype=np.uint8)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    out = open_writer(path, codec, fps, size)
+    for index in range(frames):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:, :, 0] = (x + index * 4) % 256
+        frame[:, :, 1] = (y + index * 2) % 256
+        frame[:, :, 2] = (x[::-1] + y) % 256
+        out.write(frame + noise)
+    out.release()
+    return path
+
+
+def synthetic_image(path, size=(640, 480)):
+    """Write a deterministic secret image."""
+    rng = np.random.default_rng(1)
+    cv2.imwrite(path, rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8))
+    return path
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(case):
+    """Run one case; called in its own process."""
+    method, operation = case['method'], case['operation']
+    start = time.perf_counter()
+    if method.startswith('lsb-'):
+        from stego.lsb import Steganography
+
+        steg = Steganography(bits_per_channel=int(method[4:]))
+        steg.codec = case['codec']
+        if operation == 'embed':
+            steg.embed_data(case['video'], case['secret'], case['output'], lambda value: None)
+        else:
+            steg.extract_data(case['stego'], case['output'], lambda value: None)
+    else:
+        from stego import dct
+
+        if operation == 'embed':
+            dct.embed_video(case['video'], case['secret'], case['output'], codec=case['codec'])
+        elif not dct.extract_video(case['stego'], case['output']):
+            raise Exception("Could not read the carrier frame")
+    seconds = time.perf_counter() - start
+
+    # Extraction decodes only the carrier frames, so frames per second would
+    # overstate it; extract cases are timed in seconds alone
+    return {
+        'id': case['id'],
+        'seconds': round(seconds, 4),
+        'fps': round(case['frames'] / seconds, 2) if operation == 'embed' and seconds > 0 else None,
+        'peak_rss': peak_rss(),
+        'output_size': os.path.getsize(case['output']),
+    }
+
+
+def build_cases(tmp, args):
+    """Generate the cover videos and list the cases to run on them, embeds first."""
+    secret = synthetic_image(os.path.join(tmp, 'secret.png'))
+    methods = [f'lsb-{bits}' for bits in args.bits] + ['dct']
+    cases = []
+    for resolution in args.resolutions:
+        size = tuple(int(value) for value in resolution.split('x'))
+        for frames in args.lengths:
+            for codec in args.codecs:
+                extension = CODECS[codec][1]
+                name = f'{resolution}x{frames}-{codec}'
+                video = synthetic_video(os.path.join(tmp, name + extension), size, frames, codec)
+                for method in methods:
+                    stego = os.path.join(tmp, f'{name}-{method}{extension}')
+                    common = dict(method=method, codec=codec, resolution=resolution, frames=frames)
+                    cases.append(dict(common, id=f'{method}/embed/{name}', operation='embed',
+                                      video=video, secret=secret, output=stego))
+                    cases.append(dict(common, id=f'{method}/extract/{name}', operation='extract',
+                                      stego=stego, output=os.path.join(tmp, f'{name}-{method}.png')))
+    return cases
+
+
+def run_command(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = build_cases(tmp, args)
+        for number, case in enumerate(cases, 1):
+            # A fresh process per case keeps peak RSS from leaking between cases
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_case, case).result()
+            result.update((key, case[key]) for key in
+                          ('method', 'operation', 'codec', 'resolution', 'frames'))
+            results.append(result)
+            print(f"[{number}/{len(cases)}] {case['id']:<40}{result['seconds']:>10.3f} s"
+                  f"{(result['peak_rss'] or 0) / 1e6:>9.0f} MB RSS")
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'machine': platform.machine(),
+        'cases': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+    return 0
+
+
+def compare_command(args):
+    with open(args.baseline) as f:
+        baseline = {case['id']: case for case in json.load(f)['cases']}
+    with open(args.results) as f:
+        results = {case['id']: case for case in json.load(f)['cases']}
+
+    regressions = 0
+    print(f"{'case':<40}{'seconds':>10}{'change':>9}{'RSS change':>12}")
+    for case_id, result in results.items():
+        base = baseline.get(case_id)
+        if base is None:
+            print(f"{case_id:<40}{result['seconds']:>10.3f}      new")
+            continue
+        time_change = result['seconds'] / base['seconds'] - 1 if base['seconds'] else 0.0
+        rss_change = (result['peak_rss'] / base['peak_rss'] - 1
+                      if base['peak_rss'] and result['peak_rss'] else 0.0)
+        regressed = time_change > args.threshold or rss_change > args.threshold
+        regressions += regressed
+        print(f"{case_id:<40}{result['seconds']:>10.3f}{time_change:>+9.1%}{rss_change:>+12.1%}"
+              + ("  REGRESSION" if regressed else ""))
+
+    missing = sorted(set(baseline) - set(results))
+    if missing:
+        print(f"{len(missing)} baseline cases were not run: {', '.join(missing)}")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="generate synthetic videos and time every engine")
+    run.add_argument('--output', default='benchmark_results.json', help="JSON file to write")
+    run.add_argument('--resolutions', nargs='+', default=RESOLUTIONS, metavar='WxH')
+    run.add_argument('--lengths', nargs='+', type=int, default=LENGTHS, metavar='FRAMES')
+    run.add_argument('--codecs', nargs='+', default=SUITE_CODECS, choices=sorted(CODECS))
+    run.add_argument('--bits', nargs='+', type=int, default=GUI_BITS, choices=range(1, 9),
+                     metavar='BITS', help="LSB bit depths (default: the GUI's choices)")
+    run.set_defaults(func=run_command)
+
+    compare = commands.add_parser('compare', help="flag regressions against a baseline run")
+    compare.add_argument('baseline', help="JSON written by an earlier run")
+    compare.add_argument('results', help="JSON written by the run to check")
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help="allowed fractional slowdown or RSS growth (default 0.10)")
+    compare.set_defaults(func=compare_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
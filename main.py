@@ -2,128 +2,26 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 import cv2
-import numpy as np
 from pathlib import Path
+from stego.framecache import FrameCache
+from stego.jobs import BackgroundJob
+from stego.postprocess import Bilateral, CLAHE, PostProcessor
+from stego.lsb import Steganography as LSBSteganography
 
+# Decode each cover once and reuse it for later embeds at any quality (see
+# stego.framecache); costs up to 2 GB of disk under ~/.cache/stego
+FRAME_CACHE = False
 
-class Steganography:
-    def __init__(self):
-        self.frame_size = (640, 480)  # Default frame size
-        self.bits_per_channel = 6  # Increase the number of bits per channel for better quality
-        self.original_image_size = None  # To store original image size
 
-    def embed_data(self, video_path, image_path, output_path, progress_callback):
-        try:
-            # Open video and image
-            video = cv2.VideoCapture(video_path)
-            secret_img = cv2.imread(image_path)
-            
-            # Save the original image size for later extraction
-            self.original_image_size = secret_img.shape[:2]  # height, width
-            
-            # Get video properties
-            fps = int(video.get(cv2.CAP_PROP_FPS))
-            frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            # Resize secret image to match frame size
-            secret_img = cv2.resize(secret_img, self.frame_size)
-            
-            # Setup video writer
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, self.frame_size)
-            
-            frames_processed = 0
-            mask = 2 ** self.bits_per_channel - 1  # Create bit mask for embedding
-            
-            while video.isOpened():
-                ret, frame = video.read()
-                if not ret:
-                    break
-                    
-                # Resize frame to match desired size
-                frame = cv2.resize(frame, self.frame_size)
-                
-                # Embed secret image data into multiple bits of video frame
-                if frames_processed == 0:  # Embed in first frame only
-                    for i in range(3):  # For each color channel
-                        # Clear the target bits in the frame
-                        frame[:,:,i] = frame[:,:,i] & (0xFF << self.bits_per_channel)
-                        
-                        # Shift the secret image bits to the right position
-                        secret_bits = (secret_img[:,:,i] >> (8 - self.bits_per_channel)) & mask
-                        
-                        # Embed the secret bits
-                        frame[:,:,i] = frame[:,:,i] | secret_bits
-                
-                out.write(frame)
-                frames_processed += 1
-                
-                # Update progress
-                progress = (frames_processed / frame_count) * 100
-                progress_callback(progress)
-            
-            video.release()
-            out.release()
-            return True
-            
-        except Exception as e:
-            raise Exception(f"Embedding failed: {str(e)}")
-
-    def extract_data(self, stego_video_path, output_path, progress_callback):
-        try:
-            # Open stego video
-            video = cv2.VideoCapture(stego_video_path)
-            
-            # Read first frame
-            ret, frame = video.read()
-            if not ret:
-                raise Exception("Could not read video file")
-                
-            # Resize frame if necessary
-            frame = cv2.resize(frame, self.frame_size)
-            
-            # Extract hidden image from multiple bits
-            extracted_img = np.zeros(frame.shape, dtype=np.uint8)
-            mask = 2 ** self.bits_per_channel - 1  # Create bit mask for extraction
-            
-            for i in range(3):  # For each color channel
-                # Extract the bits containing the hidden data
-                extracted_bits = frame[:,:,i] & mask
-                
-                # Shift the bits to their proper position
-                extracted_img[:,:,i] = extracted_bits << (8 - self.bits_per_channel)
-                
-                # Optional: Improve perceived quality by spreading the values
-                if self.bits_per_channel < 8:
-                    # Replicate the extracted bits to fill the remaining bits
-                    for j in range(8 - self.bits_per_channel):
-                        extracted_img[:,:,i] |= extracted_bits << j
-            
-            # Apply CLAHE for better contrast enhancement
-            lab = cv2.cvtColor(extracted_img, cv2.COLOR_BGR2LAB)
-            l, a, b = cv2.split(lab)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            l = clahe.apply(l)
-            lab = cv2.merge((l,a,b))
-            extracted_img = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-            
-            # Apply bilateral filtering for edge-preserving noise reduction
-            extracted_img = cv2.bilateralFilter(extracted_img, 5, 75, 75)
-            
-            # Resize the extracted image using higher-quality interpolation
-            if self.original_image_size:
-                extracted_img = cv2.resize(extracted_img, (self.original_image_size[1], self.original_image_size[0]), 
-                                          interpolation=cv2.INTER_LANCZOS4)
-            
-            # Save extracted image
-            cv2.imwrite(output_path, extracted_img)
-            
-            video.release()
-            progress_callback(100)  # Operation complete
-            return True
-            
-        except Exception as e:
-            raise Exception(f"Extraction failed: {str(e)}")
+class Steganography(LSBSteganography):
+    def __init__(self):
+        super().__init__(bits_per_channel=6)  # Increase the number of bits per channel for better quality
+        self.resize_interpolation = cv2.INTER_LANCZOS4  # Higher-quality interpolation
+        # CLAHE for better contrast enhancement, then bilateral filtering for
+        # edge-preserving noise reduction; both are built once and reused
+        self.postprocessor = PostProcessor([('clahe', CLAHE()), ('bilateral', Bilateral())])
+        if FRAME_CACHE:
+            self.frame_cache = FrameCache()
 
 
 class SteganographyGUI:
@@ -131,6 +29,7 @@ class SteganographyGUI:
         self.root = root
         self.root.title("High Quality Steganography Tool")
         self.steg = Steganography()
+        self.job = None  # BackgroundJob currently running
         
         # Create main notebook
         self.notebook = ttk.Notebook(root)
@@ -174,6 +73,11 @@ class SteganographyGUI:
         embed_button = ttk.Button(self.embed_frame, text="Embed", 
                                 command=self.on_embed)
         embed_button.pack(pady=10)
+
+        # Cancel button, enabled while a job runs
+        self.embed_cancel = ttk.Button(self.embed_frame, text="Cancel",
+                                     command=self.on_cancel, state='disabled')
+        self.embed_cancel.pack(pady=5)
         
         # Progress bar
         self.embed_progress = ttk.Progressbar(
@@ -194,6 +98,11 @@ class SteganographyGUI:
         extract_button = ttk.Button(self.extract_frame, text="Extract", 
                                   command=self.on_extract)
         extract_button.pack(pady=10)
+
+        # Cancel button, enabled while a job runs
+        self.extract_cancel = ttk.Button(self.extract_frame, text="Cancel",
+                                       command=self.on_cancel, state='disabled')
+        self.extract_cancel.pack(pady=5)
         
         # Progress bar
         self.extract_progress = ttk.Progressbar(
@@ -225,37 +134,76 @@ class SteganographyGUI:
     def update_progress(self, progress_bar, value):
         """Update progress bar value"""
         progress_bar['value'] = value
-        self.root.update_idletasks()
-    
+
+    def run_job(self, job, progress_bar, on_success):
+        """Start a background job and poll it from the Tk event loop"""
+        self.job = job.start()
+        self.embed_cancel.state(['!disabled'])
+        self.extract_cancel.state(['!disabled'])
+        self.root.after(100, self.poll_job, progress_bar, on_success)
+
+    def poll_job(self, progress_bar, on_success):
+        def on_error(error):
+            messagebox.showerror("Error", f"An error occurred: {str(error)}")
+
+        def on_done(result):
+            try:
+                on_success()
+            except Exception as e:
+                on_error(e)
+
+        def on_cancelled():
+            progress_bar['value'] = 0
+            messagebox.showinfo("Cancelled", "Operation cancelled.")
+
+        running = self.job.dispatch(
+            lambda value: self.update_progress(progress_bar, value),
+            on_done,
+            on_error,
+            on_cancelled
+        )
+        if running:
+            self.root.after(100, self.poll_job, progress_bar, on_success)
+        else:
+            self.job = None
+            self.embed_cancel.state(['disabled'])
+            self.extract_cancel.state(['disabled'])
+
+    def on_cancel(self):
+        if self.job:
+            self.job.cancel()
+
     def on_embed(self):
+        if self.job:
+            messagebox.showerror("Error", "Please wait for the current operation to finish.")
+            return
+
         if not (hasattr(self, 'open_video_file') and hasattr(self, 'open_image_file')):
             messagebox.showerror("Error", "Please select both video and image files.")
             return
-            
+
         output_path = filedialog.asksaveasfilename(
             defaultextension=".mp4",
             filetypes=(('MP4 files', '*.mp4'),))
-            
-        if output_path:
-            try:
-                # Reset progress bar
-                self.embed_progress['value'] = 0
-                
-                def progress_callback(value):
-                    self.update_progress(self.embed_progress, value)
 
-                success = self.steg.embed_data(
-                    self.open_video_file, 
-                    self.open_image_file,
-                    output_path,
-                    progress_callback
-                )
-                if success:
-                    messagebox.showinfo("Success", "Data embedded successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"An error occurred: {str(e)}")
+        if output_path:
+            # Reset progress bar
+            self.embed_progress['value'] = 0
+
+            video_path, image_path = self.open_video_file, self.open_image_file
+            job = BackgroundJob(
+                lambda progress_callback, cancel, output: self.steg.embed_data(
+                    video_path, image_path, output, progress_callback, cancel),
+                output_path
+            )
+            self.run_job(job, self.embed_progress,
+                         lambda: messagebox.showinfo("Success", "Data embedded successfully!"))
 
     def on_extract(self):
+        if self.job:
+            messagebox.showerror("Error", "Please wait for the current operation to finish.")
+            return
+
         if not hasattr(self, 'stego_video_file'):
             messagebox.showerror("Error", "Please select a stego video file.")
             return
@@ -265,37 +213,34 @@ class SteganographyGUI:
             filetypes=(('PNG files', '*.png'), ('JPG files', '*.jpg')))
 
         if output_path:
-            try:
-                # Reset progress bar
-                self.extract_progress['value'] = 0
-
-                def progress_callback(value):
-                    self.update_progress(self.extract_progress, value)
-
-                success = self.steg.extract_data(
-                    self.stego_video_file,
-                    output_path,
-                    progress_callback
-                )
-                if success:
-                    messagebox.showinfo("Success", "Image extracted successfully!")
-                    # Show extracted image preview
-                    img = Image.open(output_path)
-                    img = img.resize((150, 150), Image.LANCZOS)
-                    thumbnail = ImageTk.PhotoImage(img)
-
-                    # Clear previous preview if exists
-                    for widget in self.preview_frame.winfo_children():
-                        widget.destroy()
-
-                    # Add new preview
-                    preview_label = ttk.Label(self.preview_frame, text="Extracted Image:")
-                    preview_label.pack()
-                    extracted_preview = ttk.Label(self.preview_frame, image=thumbnail)
-                    extracted_preview.image = thumbnail
-                    extracted_preview.pack()
-            except Exception as e:
-                messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            # Reset progress bar
+            self.extract_progress['value'] = 0
+
+            stego_video_path = self.stego_video_file
+            job = BackgroundJob(
+                lambda progress_callback, cancel, output: self.steg.extract_data(
+                    stego_video_path, output, progress_callback),
+                output_path
+            )
+            self.run_job(job, self.extract_progress, lambda: self.show_preview(output_path))
+
+    def show_preview(self, output_path):
+        messagebox.showinfo("Success", "Image extracted successfully!")
+        # Show extracted image preview
+        img = Image.open(output_path)
+        img = img.resize((150, 150), Image.LANCZOS)
+        thumbnail = ImageTk.PhotoImage(img)
+
+        # Clear previous preview if exists
+        for widget in self.preview_frame.winfo_children():
+            widget.destroy()
+
+        # Add new preview
+        preview_label = ttk.Label(self.preview_frame, text="Extracted Image:")
+        preview_label.pack()
+        extracted_preview = ttk.Label(self.preview_frame, image=thumbnail)
+        extracted_preview.image = thumbnail
+        extracted_preview.pack()
 
 def main():
     root = tk.Tk()
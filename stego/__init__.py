@@ -0,0 +1 @@
+"""Reusable steganography engines shared by the GUI scripts."""
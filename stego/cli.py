@@ -0,0 +1,318 @@
+"""Headless command line for the steganography engines.
+
+Never imports tkinter, so it runs on servers and in worker processes:
+
+    python -m stego batch jobs.csv --workers 8 --report report.json
+
+Accept jobs from other local tools over HTTP, see stego.service:
+
+    python -m stego serve --workers 4 --port 8765
+
+Compare a cover video with its stego version frame by frame:
+
+    python -m stego quality cover.mp4 stego.mp4 --csv frames.csv --secret secret.png
+
+With --frame-cache DIR, LSB embeds decode each cover once into a memory-mapped
+cache there (see stego.framecache) and reuse it for later jobs on that cover.
+
+With --timings DIR, each batch job also writes its per-stage timings (decode,
+resize, bits, encode, ...) to DIR/job-<n>.json, or .prom with --prometheus.
+
+A manifest is a CSV file with a header row, or a JSON list of objects, with
+one job per entry:
+
+    mode              embed (default) or extract
+    video             cover video (embed) or stego video (extract)
+    secret            image to hide (embed only)
+    output            stego video (embed) or extracted image (extract)
+    method            lsb (default) or dct
+    bits_per_channel  LSB bit depth, 1-8 (default 6)
+    codec             output writer from stego.codecs (default mp4v; ffv1 for header and
+                      binary jobs, which need a lossless codec)
+    header            write a payload header into frame 0 (true/false)
+    native            LSB at the video's own resolution, no 640x480 resize (true/false)
+    postprocess       LSB extract clean-up stages, e.g. gaussian,clahe (see stego.postprocess)
+    binary            hide the secret file's bytes exactly instead of an image (true/false)
+    compression       compress header/binary payloads first: zlib, lzma or zstd, with an
+                      optional level, e.g. lzma:9
+    shards            embed with this many segment processes, joined without re-encoding
+                      (needs ffmpeg, see stego.shard)
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from stego import timing
+from stego.pipeline import PipelineCancelled
+
+METHODS = ('lsb', 'dct')
+
+
+def load_manifest(path):
+    """Read a CSV or JSON manifest into a list of job dicts."""
+    with open(path, newline='') as f:
+        if path.lower().endswith('.json'):
+            jobs = json.load(f)
+        else:
+            jobs = list(csv.DictReader(f))
+    return load_jobs(jobs)
+
+
+def load_jobs(jobs):
+    """Normalize and validate job dicts; raises ValueError on the first bad one."""
+    for number, job in enumerate(jobs, 1):
+        if not isinstance(job, dict):
+            raise ValueError(f"Job {number}: expected an object")
+        for key, default in (('mode', 'embed'), ('method', 'lsb')):
+            value = job.get(key) or default
+            if not isinstance(value, str):
+                raise ValueError(f"Job {number}: {key} must be a string")
+            job[key] = value.strip().lower()
+        required = ('video', 'secret', 'output') if job['mode'] == 'embed' else ('video', 'output')
+        missing = [key for key in required if not job.get(key)]
+        if job['mode'] not in ('embed', 'extract'):
+            raise ValueError(f"Job {number}: unknown mode '{job['mode']}'")
+        if job['method'] not in METHODS:
+            raise ValueError(f"Job {number}: unknown method '{job['method']}'")
+        if missing:
+            raise ValueError(f"Job {number}: missing {', '.join(missing)}")
+    return jobs
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def run_job(job, progress_callback=None):
+    """Run one manifest job; never raises, so one bad job can't stop a batch.
+
+    A PipelineCancelled raised by `progress_callback` stops the job with
+    status 'cancelled'. The output is written to a temporary file that
+    replaces `output` only when the job succeeds.
+    """
+    from stego.jobs import staged_output
+
+    start = time.perf_counter()
+    instrument = timing.instrument(report=job['timings']) if job.get('timings') else nullcontext()
+    extra = {}
+    try:
+        with instrument, staged_output(job['output']) as output_path:
+            extra = _run_engine(dict(job, output=output_path), progress_callback or (lambda value: None))
+        status, error = 'ok', None
+    except PipelineCancelled:
+        status, error = 'cancelled', None
+    except Exception as e:
+        status, error = 'failed', str(e)
+
+    return dict(job, status=status, error=error, seconds=round(time.perf_counter() - start, 3), **extra)
+
+
+# Post-processing chains are built once per worker process and reused
+_postprocessors = {}
+
+
+def _compression(job):
+    method, _, level = (job.get('compression') or '').strip().lower().partition(':')
+    return method or None, int(level) if level else None
+
+
+def _run_engine(job, progress_callback):
+    """Run one job; returns extra result fields."""
+    if job['method'] == 'lsb':
+        from stego.lsb import Steganography
+        from stego.postprocess import PostProcessor
+
+        bits_per_channel = int(job.get('bits_per_channel') or 6)
+        if not 1 <= bits_per_channel <= 8:
+            raise Exception(f"bits_per_channel must be 1-8, got {bits_per_channel}")
+        steg = Steganography(bits_per_channel=bits_per_channel)
+        if _flag(job.get('native')):
+            steg.frame_size = None
+        steg.use_header = _flag(job.get('header'))
+        # Headers and byte payloads must survive encoding bit for bit
+        lossless = steg.use_header or (job['mode'] == 'embed' and _flag(job.get('binary')))
+        steg.codec = job.get('codec') or ('ffv1' if lossless else steg.codec)
+        steg.compression, steg.compression_level = _compression(job)
+        steg.shard_workers = int(job.get('shards') or 0) or None
+        if job.get('frame_cache'):
+            from stego.framecache import FrameCache
+
+            steg.frame_cache = FrameCache(job['frame_cache'], int(job['cache_budget']) * 1024 ** 2)
+        if job['mode'] == 'embed' and _flag(job.get('binary')):
+            with open(job['secret'], 'rb') as f:
+                steg.embed_bytes(job['video'], f.read(), job['output'], progress_callback)
+            return {}
+        if job['mode'] == 'embed':
+            steg.embed_data(job['video'], job['secret'], job['output'], progress_callback)
+            return {}
+
+        names = (job.get('postprocess') or '').strip().lower()
+        if names:
+            if names not in _postprocessors:
+                _postprocessors[names] = PostProcessor.from_names(names)
+            steg.postprocessor = _postprocessors[names]
+            steg.postprocessor.last_costs = {}  # Stays empty if extraction skips the chain
+        steg.extract_data(job['video'], job['output'], progress_callback)
+        if steg.postprocessor is None:
+            return {}
+        return {'postprocess_seconds': {name: round(seconds, 4)
+                                        for name, seconds in steg.postprocessor.last_costs.items()}}
+    else:
+        from stego import dct
+
+        if job['mode'] == 'embed' and _flag(job.get('binary')):
+            with open(job['secret'], 'rb') as f:
+                method, level = _compression(job)
+                dct.embed_bytes(job['video'], f.read(), job['output'], codec=job.get('codec') or 'ffv1',
+                                progress_callback=progress_callback, compression=method,
+                                compression_level=level)
+        elif job['mode'] == 'embed':
+            header = _flag(job.get('header'))
+            dct.embed_video(job['video'], job['secret'], job['output'],
+                            codec=job.get('codec') or ('ffv1' if header else 'mp4v'),
+                            header=header, workers=int(job.get('shards') or 0) or None,
+                            progress_callback=progress_callback)
+        elif _flag(job.get('binary')):
+            data, checksum_ok = dct.extract_bytes(job['video'], progress_callback=progress_callback)
+            if not checksum_ok:
+                raise Exception("Payload checksum mismatch")
+            with open(job['output'], 'wb') as f:
+                f.write(data)
+        elif not dct.extract_video(job['video'], job['output'], progress_callback=progress_callback):
+            raise Exception("Could not read the carrier frame")
+        return {}
+
+
+def run_batch(jobs, workers=None):
+    """Run jobs across a process pool and return their results in manifest order."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_job, jobs))
+
+
+def print_summary(results, elapsed):
+    for result in results:
+        line = f"{result['status']:<7}{result['seconds']:>9.2f}s  {result['mode']:<8}{result['method']:<5}{result['output']}"
+        if result['error']:
+            line += f"  ({result['error']})"
+        print(line)
+    failed = sum(result['status'] != 'ok' for result in results)
+    print(f"{len(results) - failed}/{len(results)} jobs succeeded in {elapsed:.2f}s")
+
+
+def batch_command(args):
+    jobs = load_manifest(args.manifest)
+    if args.frame_cache:
+        for job in jobs:
+            job.update(frame_cache=args.frame_cache, cache_budget=args.cache_budget)
+    if args.timings:
+        os.makedirs(args.timings, exist_ok=True)
+        extension = '.prom' if args.prometheus else '.json'
+        for number, job in enumerate(jobs, 1):
+            job['timings'] = os.path.join(args.timings, f'job-{number}{extension}')
+    start = time.perf_counter()
+    results = run_batch(jobs, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print_summary(results, elapsed)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'elapsed': round(elapsed, 3), 'jobs': results}, f, indent=2)
+    return 1 if any(result['status'] != 'ok' for result in results) else 0
+
+
+def quality_command(args):
+    from stego import quality
+
+    start = time.perf_counter()
+    rows = quality.analyze(args.cover, args.stego, args.workers, args.batch_size, args.secret,
+                           args.bits_per_channel)
+    elapsed = time.perf_counter() - start
+    if args.csv:
+        quality.write_csv(rows, args.csv)
+
+    summary = quality.summarize(rows)
+    if not rows:
+        # Nothing to average: the SSIM figures are None
+        print("error: no frames could be compared", file=sys.stderr)
+        return 1
+    print(f"{summary['frames']} frames in {elapsed:.2f}s ({summary['frames'] / elapsed:.0f} fps)")
+    print(f"PSNR  mean {summary['psnr_mean']:.2f} dB, min {summary['psnr_min']:.2f} dB "
+          f"({summary['identical_frames']} identical frames)")
+    print(f"SSIM  mean {summary['ssim_mean']:.4f}, min {summary['ssim_min']:.4f}")
+    if summary['ber'] is not None:
+        print(f"BER   {summary['ber']:.3e} ({summary['bit_errors']} bit errors "
+              f"in {summary['carrier_frames']} carrier frames)")
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+def serve_command(args):
+    import asyncio
+
+    from stego.service import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.socket, args.workers, args.max_queue))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m stego', description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help="run embed/extract jobs from a manifest")
+    batch.add_argument('manifest', help="CSV or JSON job manifest")
+    batch.add_argument('--workers', type=int, default=os.cpu_count(),
+                       help="worker processes (default: one per CPU)")
+    batch.add_argument('--report', help="write per-job results to this JSON file")
+    batch.add_argument('--frame-cache', metavar='DIR',
+                       help="decode each LSB cover once into a memory-mapped cache here")
+    batch.add_argument('--cache-budget', type=int, default=2048, metavar='MB',
+                       help="disk space the frame cache may use (default 2048 MB)")
+    batch.add_argument('--timings', metavar='DIR', help="write per-stage timings for each job here")
+    batch.add_argument('--prometheus', action='store_true',
+                       help="write timings as Prometheus textfiles instead of JSON")
+    batch.set_defaults(func=batch_command)
+
+    analyze = commands.add_parser('quality', help="per-frame PSNR, SSIM and payload BER of a stego video")
+    analyze.add_argument('cover', help="original video")
+    analyze.add_argument('stego', help="video with the embedded payload")
+    analyze.add_argument('--csv', help="write per-frame metrics to this CSV file")
+    analyze.add_argument('--summary', help="write the summary to this JSON file")
+    analyze.add_argument('--secret', help="embedded image, to measure the LSB bit-error rate")
+    analyze.add_argument('--bits-per-channel', type=int, default=6,
+                         help="LSB bit depth when the video has no payload header (default 6)")
+    analyze.add_argument('--workers', type=int, default=1, help="processes, one segment each")
+    analyze.add_argument('--batch-size', type=int, default=8, help="frames per vectorized batch")
+    analyze.set_defaults(func=quality_command)
+
+    service = commands.add_parser('serve', help="accept embed/extract jobs over local HTTP")
+    service.add_argument('--host', default='127.0.0.1', help="address to listen on (default 127.0.0.1)")
+    service.add_argument('--port', type=int, default=8765, help="TCP port (default 8765)")
+    service.add_argument('--socket', metavar='PATH', help="listen on this Unix socket instead of TCP")
+    service.add_argument('--workers', type=int, default=os.cpu_count(),
+                         help="jobs run at once, one process each (default: one per CPU)")
+    service.add_argument('--max-queue', type=int, default=100,
+                         help="jobs allowed to wait before submissions are refused (default 100)")
+    service.set_defaults(func=serve_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,58 @@
+import cv2
+
+from stego import remux
+
+# Writer name -> (fourcc, container extension, lossless). OpenCV writes
+# HuffYUV from BGR frames as RGB (bgr0, per ffprobe), so it keeps every bit.
+CODECS = {
+    'mp4v': ('mp4v', '.mp4', False),
+    'mjpg': ('MJPG', '.avi', False),
+    'ffv1': ('FFV1', '.mkv', True),
+    'png': ('png ', '.mkv', True),
+    'huffyuv': ('HFYU', '.avi', True),
+}
+
+# Codec tags (upper case) and ffprobe codec names of streams that decode bit-exactly
+LOSSLESS_FOURCCS = {'FFV1', 'MPNG', 'PNG ', 'HFYU'}
+LOSSLESS_CODEC_NAMES = {'ffv1', 'png', 'huffyuv'}
+
+
+def open_writer(output_path, codec, fps, frame_size):
+    """Open a cv2.VideoWriter for one of the codecs in CODECS."""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}', expected one of: {', '.join(CODECS)}")
+    fourcc = cv2.VideoWriter_fourcc(*CODECS[codec][0])
+    out = cv2.VideoWriter(output_path, fourcc, fps, frame_size)
+    if not out.isOpened():
+        raise Exception(f"Could not open a {codec} writer for {output_path}")
+    return out
+
+
+def require_lossless(codec, what):
+    """Raise unless `codec` keeps every bit; `what` names the payload that needs it."""
+    if codec in CODECS and not CODECS[codec][2]:
+        lossless = ', '.join(name for name, (_, _, exact) in CODECS.items() if exact)
+        raise Exception(f"{what} need a lossless codec ({lossless}), not {codec}")
+
+
+def fourcc_of(video):
+    code = int(video.get(cv2.CAP_PROP_FOURCC))
+    return ''.join(chr((code >> shift) & 0xFF) for shift in (0, 8, 16, 24))
+
+
+def is_lossless(video_path):
+    """True if the video stream is known to decode bit-exactly."""
+    video = cv2.VideoCapture(video_path)
+    fourcc = fourcc_of(video)
+    video.release()
+    # OpenCV reports some tags in lower case, e.g. 'ffv1' for FFV1 in Matroska
+    if fourcc.upper() in LOSSLESS_FOURCCS:
+        return True
+
+    # Some containers carry no codec tag; ask ffprobe when it is around
+    if remux.available():
+        try:
+            return remux.probe(video_path)['codec'] in LOSSLESS_CODEC_NAMES
+        except RuntimeError:
+            return False
+    return False
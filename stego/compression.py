@@ -0,0 +1,67 @@
+"""Optional compression of byte payloads before they are embedded.
+
+Fewer payload bytes means fewer carrier frames to decode, modify and
+re-encode. The method used is recorded in the payload header flags, so the
+extractor knows how to reverse it. zstd is offered only when the
+`zstandard` package is installed.
+"""
+import lzma
+import zlib
+
+from stego.header import FLAG_LZMA, FLAG_ZLIB, FLAG_ZSTD
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Level used when none is given
+DEFAULT_LEVELS = {'zlib': 6, 'lzma': 6, 'zstd': 3}
+
+_FLAGS = {'zlib': FLAG_ZLIB, 'lzma': FLAG_LZMA, 'zstd': FLAG_ZSTD}
+
+
+def available():
+    """Compression methods usable in this environment."""
+    return [method for method in _FLAGS if method != 'zstd' or zstandard is not None]
+
+
+def compress(data, method, level=None):
+    """Return (packed, flag): `data` compressed with `method`, and its header flag.
+
+    When compression doesn't make the payload smaller, `data` is returned
+    unchanged with flag 0.
+    """
+    if method not in _FLAGS:
+        raise ValueError(f"Unknown compression method '{method}', expected one of {', '.join(_FLAGS)}")
+    if method == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression needs the zstandard package")
+    level = DEFAULT_LEVELS[method] if level is None else level
+
+    if method == 'zlib':
+        packed = zlib.compress(data, level)
+    elif method == 'lzma':
+        packed = lzma.compress(data, preset=level)
+    else:
+        packed = zstandard.ZstdCompressor(level=level).compress(data)
+    if len(packed) >= len(data):
+        return data, 0
+    return packed, _FLAGS[method]
+
+
+def method_of(flags):
+    """The compression method named by header `flags`, or None."""
+    return next((method for method, flag in _FLAGS.items() if flags & flag), None)
+
+
+def decompress(data, flags):
+    """Undo `compress` according to the header `flags`; uncompressed data passes through."""
+    if flags & FLAG_ZLIB:
+        return zlib.decompress(data)
+    if flags & FLAG_LZMA:
+        return lzma.decompress(data)
+    if flags & FLAG_ZSTD:
+        if zstandard is None:
+            raise Exception("The payload is zstd-compressed; install zstandard to extract it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
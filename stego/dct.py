@@ -0,0 +1,531 @@
+import zlib
+
+import cv2
+import numpy as np
+
+from stego import remux, shard, timing
+from stego.codecs import is_lossless, open_writer, require_lossless
+from stego.compression import compress, decompress
+from stego.header import FLAG_BYTES, METHOD_DCT, PayloadHeader, read_header, write_header
+from stego.permutation import legacy_permutation
+from stego.video import FrameReader
+
+
+def reconstruct_image(coefficients, size=(512, 512)):
+    """Tile a block of DCT coefficients into an 8-bit RGB image.
+
+    A 2-D block fills the first channel only, as extract_6.py always did;
+    a (h, w, 3) stack fills one channel per block. The result is identical
+    to scaling, clipping and truncating every pixel one by one.
+    """
+    coefficients = np.asarray(coefficients)
+    height, width = size
+    block_h, block_w = coefficients.shape[:2]
+
+    # Use the same float type the scalar expression `coefficient * 255.0`
+    # would, so truncation to uint8 matches the old loop exactly
+    dtype = (coefficients.dtype.type(0) * 255.0).dtype
+    scaled = np.multiply(coefficients, 255.0, dtype=dtype)
+    np.clip(scaled, 0, 255, out=scaled)
+
+    # Clip the small block once, then repeat it over the whole image
+    reps = (-(-height // block_h), -(-width // block_w)) + (1,) * (scaled.ndim - 2)
+    tiled = np.tile(scaled, reps)[:height, :width]
+
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    if tiled.ndim == 2:
+        image[:, :, 0] = tiled
+    else:
+        channels = min(tiled.shape[2], 3)
+        image[:, :, :channels] = tiled[:, :, :channels]
+    return image
+
+
+# Coefficients (row, column) inside each block that carry a pixel's R, G, B
+BLOCK_POSITIONS = ((4, 0), (5, 0), (6, 0))
+
+# Block-mode image rows store pixel value v as the coefficient v / 255 *
+# BLOCK_STRENGTH, replacing what was there. One such coefficient moves a
+# pixel of its block by at most 0.18 * BLOCK_STRENGTH grey levels.
+BLOCK_STRENGTH = 32.0
+
+# Byte payloads quantise each carrier coefficient to a multiple of QIM_STEP / 2
+# whose parity is the bit. Blocks are first squeezed into
+# [HEADROOM, 255 - HEADROOM] so no pixel clips: moving three coefficients by
+# up to 12 shifts a pixel by at most 6.3, and rounding back to uint8 moves a
+# coefficient by at most 4, under the 6 it takes to flip a bit.
+QIM_STEP = 24.0
+HEADROOM = 8
+
+
+def dct_matrix(size):
+    """Orthonormal DCT-II basis, scaled the same way as cv2.dct."""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    basis = np.sqrt(2.0 / size) * np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+class BlockDCT:
+    """Batched DCT over square blocks of a single-channel plane.
+
+    The plane is viewed as a grid of `block_size` blocks in raster order and
+    only the blocks that carry payload are gathered, transformed with one
+    batched matrix multiply, modified and transformed back, so the cost per
+    frame follows the payload size rather than the frame resolution.
+    """
+
+    def __init__(self, block_size=8):
+        self.block_size = block_size
+        self.basis = dct_matrix(block_size)
+
+    def forward(self, blocks):
+        return self.basis @ blocks @ self.basis.T
+
+    def inverse(self, coefficients):
+        return self.basis.T @ coefficients @ self.basis
+
+    def band_height(self, block_count, width):
+        """Rows of the plane covered by the first `block_count` blocks."""
+        per_row = width // self.block_size
+        if per_row == 0:
+            raise ValueError("Frame is narrower than one DCT block")
+        return -(-block_count // per_row) * self.block_size
+
+    def _grid(self, plane, block_count):
+        b = self.block_size
+        per_row = plane.shape[1] // b
+        rows = -(-block_count // per_row)
+        if rows * b > plane.shape[0]:
+            raise ValueError("Frame is too small for the payload")
+        # A (rows, cols, b, b) view onto the plane, no copy
+        grid = plane[:rows * b, :per_row * b].reshape(rows, b, per_row, b).swapaxes(1, 2)
+        return grid, np.divmod(np.arange(block_count), per_row)
+
+    def embed(self, plane, values, positions=BLOCK_POSITIONS):
+        """Set coefficient `positions[p]` of block k to `values[k, p]`, in place.
+
+        `plane` is a uint8 plane (it may be a strided view such as one channel
+        of a YUV frame); blocks past `len(values)` are never touched.
+        """
+        values = np.asarray(values, dtype=np.float32)
+        grid, (rows, cols) = self._grid(plane, len(values))
+
+        with timing.stage(timing.DCT):
+            coefficients = self.forward(grid[rows, cols].astype(np.float32))
+        coefficient_rows, coefficient_cols = zip(*positions)
+        coefficients[:, coefficient_rows, coefficient_cols] = values
+
+        with timing.stage(timing.IDCT):
+            pixels = self.inverse(coefficients)
+            np.rint(pixels, out=pixels)
+            np.clip(pixels, 0, 255, out=pixels)
+            grid[rows, cols] = pixels
+
+    def extract(self, plane, block_count, positions=BLOCK_POSITIONS):
+        """Read back a (block_count, len(positions)) array of the coefficients `embed` sets."""
+        grid, (rows, cols) = self._grid(plane, block_count)
+        with timing.stage(timing.DCT):
+            coefficients = self.forward(grid[rows, cols].astype(np.float32))
+        coefficient_rows, coefficient_cols = zip(*positions)
+        return coefficients[:, coefficient_rows, coefficient_cols]
+
+    def embed_bits(self, plane, bits, positions=BLOCK_POSITIONS, step=QIM_STEP):
+        """Store `bits[k, p]` in coefficient `positions[p]` of block k, in place.
+
+        Unlike `embed`, the bits read back exactly with `extract_bits` as long
+        as the plane itself survives exactly (see QIM_STEP).
+        """
+        bits = np.asarray(bits, dtype=np.uint8)
+        grid, (rows, cols) = self._grid(plane, len(bits))
+
+        blocks = grid[rows, cols].astype(np.float32)
+        blocks *= (255 - 2 * HEADROOM) / 255
+        blocks += HEADROOM
+        with timing.stage(timing.DCT):
+            coefficients = self.forward(blocks)
+
+        # Move each coefficient to the nearest level with the bit's parity
+        coefficient_rows, coefficient_cols = zip(*positions)
+        scaled = coefficients[:, coefficient_rows, coefficient_cols] / (step / 2)
+        levels = np.round(scaled)
+        wrong = (levels.astype(np.int64) & 1) != bits
+        levels[wrong] += np.where(scaled > levels, 1, -1)[wrong]
+        coefficients[:, coefficient_rows, coefficient_cols] = levels * (step / 2)
+
+        with timing.stage(timing.IDCT):
+            pixels = self.inverse(coefficients)
+            np.rint(pixels, out=pixels)
+            np.clip(pixels, 0, 255, out=pixels)
+            grid[rows, cols] = pixels
+
+    def extract_bits(self, plane, block_count, positions=BLOCK_POSITIONS, step=QIM_STEP):
+        """Read back a (block_count, len(positions)) array of bits written by `embed_bits`."""
+        grid, (rows, cols) = self._grid(plane, block_count)
+        with timing.stage(timing.DCT):
+            coefficients = self.forward(grid[rows, cols].astype(np.float32))
+        coefficient_rows, coefficient_cols = zip(*positions)
+        levels = np.round(coefficients[:, coefficient_rows, coefficient_cols] / (step / 2))
+        return (levels.astype(np.int64) & 1).astype(np.uint8)
+
+
+def coefficient_mask(shape, row_length, rows=(4, 5, 6)):
+    """Boolean mask selecting the legacy layout: R, G, B in rows 4, 5, 6."""
+    mask = np.zeros(shape, dtype=bool)
+    mask[list(rows), :row_length] = True
+    return mask
+
+
+def embed_frame_full(frame, row, mask=None):
+    """Embed one secret row into a BGR frame via a full-plane DCT (legacy).
+
+    Without `mask`, pixel i's R, G, B are added to coefficients (4, i),
+    (5, i) and (6, i). A boolean `mask` selects any other 3 * len(row)
+    coefficients, filled in row-major order with all R values, then all G
+    values, then all B values.
+    """
+    with timing.stage(timing.COLOR):
+        yuv_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV)
+    y_channel = yuv_frame[:, :, 0]
+
+    with timing.stage(timing.DCT):
+        dct_frame = cv2.dct(np.float32(y_channel) / 255.0)
+
+    # One array operation for the whole row instead of three per pixel
+    values = row.T / 255.0
+    if mask is None:
+        dct_frame[4:7, :len(row)] += values
+    else:
+        dct_frame[mask] += values.ravel()
+
+    with timing.stage(timing.IDCT):
+        modified_y_channel = cv2.idct(dct_frame) * 255.0
+    modified_y_channel = np.clip(modified_y_channel, 0, 255).astype(np.uint8)
+    yuv_frame[:, :, 0] = modified_y_channel
+    with timing.stage(timing.COLOR):
+        return cv2.cvtColor(yuv_frame, cv2.COLOR_YUV2BGR)
+
+
+def embed_frame_blocks(frame, row, transform, positions=BLOCK_POSITIONS):
+    """Embed one secret row into the leading DCT blocks of a BGR frame, in place.
+
+    Pixel k's values go into block k, scaled by BLOCK_STRENGTH. Only the band
+    of rows holding payload blocks goes through the colour conversion; the
+    rest of the frame is left exactly as decoded.
+    """
+    band = frame[:transform.band_height(len(row), frame.shape[1])]
+    with timing.stage(timing.COLOR):
+        yuv_band = cv2.cvtColor(band, cv2.COLOR_BGR2YUV)
+    transform.embed(yuv_band[:, :, 0], np.asarray(row, dtype=np.float32) * (BLOCK_STRENGTH / 255.0), positions)
+    with timing.stage(timing.COLOR):
+        band[:] = cv2.cvtColor(yuv_band, cv2.COLOR_YUV2BGR)
+    return frame
+
+
+def extract_frame_blocks(frame, length, transform, positions=BLOCK_POSITIONS):
+    """Recover a `length`-pixel row written by embed_frame_blocks, as uint8 values."""
+    band = frame[:transform.band_height(length, frame.shape[1])]
+    with timing.stage(timing.COLOR):
+        y_band = cv2.cvtColor(band, cv2.COLOR_BGR2YUV)[:, :, 0]
+    values = transform.extract(y_band, length, positions) * (255.0 / BLOCK_STRENGTH)
+    return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+
+def frame_bit_capacity(shape, transform, positions=BLOCK_POSITIONS):
+    """Payload bits one frame holds: every whole block of every channel."""
+    b = transform.block_size
+    return (shape[0] // b) * (shape[1] // b) * len(positions) * 3
+
+
+def embed_frame_bits(frame, bits, transform, positions=BLOCK_POSITIONS):
+    """Write a bit array into the DCT blocks of a BGR frame, channel by channel, in place."""
+    per_plane = frame_bit_capacity(frame.shape, transform, positions) // 3
+    for channel in range(3):
+        part = bits[channel * per_plane:(channel + 1) * per_plane]
+        if len(part) == 0:
+            break
+        padded = np.zeros(-(-len(part) // len(positions)) * len(positions), dtype=np.uint8)
+        padded[:len(part)] = part
+        transform.embed_bits(frame[:, :, channel], padded.reshape(-1, len(positions)), positions)
+    return frame
+
+
+def extract_frame_bits(frame, count, transform, positions=BLOCK_POSITIONS):
+    """Read `count` bits written by embed_frame_bits."""
+    per_plane = frame_bit_capacity(frame.shape, transform, positions) // 3
+    parts = []
+    for channel in range(3):
+        length = min(per_plane, count - channel * per_plane)
+        if length <= 0:
+            break
+        blocks = -(-length // len(positions))
+        parts.append(transform.extract_bits(frame[:, :, channel], blocks, positions).reshape(-1)[:length])
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint8)
+
+
+def embed_video(video_path, image_path, output_path, block_size=None, max_frames=64,
+                smart_render=False, codec='mp4v', header=False, workers=None, progress_callback=None):
+    """Hide a 64x64 image in the luma DCT of the first `max_frames` frames.
+
+    Frame k carries row k of the image, added to the full-plane transform.
+    With `block_size` set, each pixel of the row goes into its own DCT block
+    instead (see embed_frame_blocks); extract_video then needs the same
+    `block_size`, or a header, to read it back. With `smart_render`, only
+    the GOPs holding those frames are re-encoded and the rest of the video
+    is stream-copied; otherwise the whole video is written with `codec`
+    (see stego.codecs).
+    With `header`, frame 0 carries a PayloadHeader and the rows move to
+    frames 1 to `max_frames`; the header only survives a lossless `codec`.
+    `workers` embeds keyframe-aligned segments in that many processes and
+    joins them without re-encoding (see stego.shard). `progress_callback`
+    gets the percentage written after every frame; an exception it raises
+    (PipelineCancelled, say) stops the embed.
+    """
+    from PIL import Image  # Imported here so the byte engines never load Pillow
+
+    cap = cv2.VideoCapture(video_path)
+    secret_image = Image.open(image_path).convert("RGB")
+    secret_image = secret_image.resize((64, 64))  # Resize for embedding
+    secret_data = np.array(secret_image)
+    max_frames = min(max_frames, len(secret_data))
+
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    transform = BlockDCT(block_size) if block_size else None
+
+    first_frame = 0
+    payload_header = None
+    if header:
+        # Smart render re-encodes with the source codec instead
+        if not smart_render:
+            require_lossless(codec, "Payload headers")
+        elif not is_lossless(video_path):
+            raise Exception("Payload headers need a lossless source video for smart render")
+        # The header must only claim rows the video has frames for; like the
+        # headerless embed, rows past the end of the video are dropped
+        if frame_count < 2:
+            raise Exception("Payload headers need a video of at least 2 frames")
+        max_frames = min(max_frames, frame_count - 1)
+        # bits_per_channel records the block size, 0 for the full-plane transform
+        payload_header = PayloadHeader(METHOD_DCT, block_size or 0, *secret_data.shape,
+                                       payload_length=secret_data.size,
+                                       first_frame=1, frame_count=max_frames,
+                                       payload_crc=zlib.crc32(secret_data))
+        first_frame = payload_header.first_frame
+
+    def embed_frame(frame_index, frame):
+        if payload_header is not None and frame_index == 0:
+            return write_header(frame, payload_header)
+        if not first_frame <= frame_index < first_frame + max_frames:
+            return frame
+        row = secret_data[frame_index - first_frame]
+        if transform is not None:
+            return embed_frame_blocks(frame, row, transform)
+        return embed_frame_full(frame, row)
+
+    if smart_render:
+        cap.release()
+        remux.smart_render(video_path, output_path, embed_frame, first_frame + max_frames - 1,
+                           progress_callback)
+        return
+
+    if workers:
+        # Like the serial loop, rows past the end of the video are dropped
+        cap.release()
+        rows = range(min(max_frames, max(frame_count - first_frame, 0)))
+        edits = {first_frame + r: [('dct-row', (secret_data[r], block_size))] for r in rows}
+        if payload_header is not None:
+            edits[0] = [('header', (payload_header.pack(),))]
+        shard.embed_sharded(video_path, output_path, edits, workers, codec, fps,
+                            progress_callback=progress_callback)
+        return
+
+    out = open_writer(output_path, codec, fps, (width, height))
+
+    def report(frame_index):
+        if progress_callback and frame_count:
+            progress_callback(min(frame_index / frame_count * 100, 100))
+
+    frame_index = 0
+    ret = True
+    try:
+        while cap.isOpened() and frame_index < first_frame + max_frames:
+            with timing.stage(timing.DECODE):
+                ret, frame = cap.read()
+            if not ret:
+                break
+
+            frame = embed_frame(frame_index, frame)
+            with timing.stage(timing.ENCODE):
+                out.write(frame)
+            frame_index += 1
+            report(frame_index)
+
+        # Continue writing remaining frames without modification
+        while ret:
+            with timing.stage(timing.DECODE):
+                ret, frame = cap.read()
+            if ret:
+                with timing.stage(timing.ENCODE):
+                    out.write(frame)
+                frame_index += 1
+                report(frame_index)
+    finally:
+        cap.release()
+        out.release()
+
+
+def extract_video(video_path, output_image_path, seed=42, block_size=None, progress_callback=None):
+    """Save the image embedded by embed_video.
+
+    The carrier frames come from the payload header when frame 0 has one,
+    and from the legacy `random.seed(seed)` shuffle otherwise. The full-plane
+    format is read from the coefficients of the first carrier frame; the
+    block format (`block_size`, or the one the header records) gets one
+    image row from each carrier frame. Returns False when a carrier frame
+    can't be read. `progress_callback` gets the percentage of carrier frames
+    read after each one.
+    """
+    reader = FrameReader(video_path, indexed=True)
+    frame = reader.read(0)
+    header = read_header(frame) if frame is not None else None
+    if header is not None and header.method == METHOD_DCT:
+        block_size = header.bits_per_channel or None
+        shape = (header.height, header.width, header.channels)
+        carriers = header.carrier_frames()  # Rows past frame_count stay black
+    else:
+        shape = (64, 64, 3)
+        if block_size:
+            carriers = list(range(shape[0]))  # embed_video writes row k to frame k
+        else:
+            carriers = legacy_permutation(reader.frame_count, seed)
+    if not block_size:
+        carriers = carriers[:1]
+
+    frames = []
+    try:
+        for carrier in carriers:
+            # Seek straight to each frame used for embedding
+            with timing.stage(timing.DECODE):
+                frames.append(reader.read(carrier))
+            if progress_callback:
+                progress_callback(len(frames) / len(carriers) * 100)
+    finally:
+        reader.release()
+    if not frames or any(frame is None for frame in frames):
+        return False
+
+    if block_size:
+        transform = BlockDCT(block_size)
+        height, width, channels = shape
+        extracted_data = np.zeros(shape, dtype=np.uint8)
+        for row, frame in enumerate(frames):
+            with timing.stage(timing.BITS):
+                extracted_data[row] = extract_frame_blocks(frame, width, transform)[:, :channels]
+    else:
+        with timing.stage(timing.COLOR):
+            yuv_frame = cv2.cvtColor(frames[0], cv2.COLOR_BGR2YUV)
+        y_channel = yuv_frame[:, :, 0]
+
+        with timing.stage(timing.DCT):
+            dct_frame = cv2.dct(np.float32(y_channel) / 255.0)
+        with timing.stage(timing.BITS):
+            extracted_data = reconstruct_image(dct_frame[:64, :64])  # Extract R channel
+
+    from PIL import Image
+
+    with timing.stage(timing.ENCODE):
+        Image.fromarray(extracted_data, 'RGB').save(output_image_path)
+    return True
+
+
+def embed_bytes(video_path, data, output_path, codec='ffv1', block_size=8, progress_callback=None,
+                compression=None, compression_level=None):
+    """Hide arbitrary bytes in the DCT blocks of frames 1, 2, ... behind a payload header.
+
+    Every block of every colour channel carries len(BLOCK_POSITIONS) bits.
+    The frames must reach the extractor unchanged, so `codec` has to be a
+    lossless one (see stego.codecs). `compression` ('zlib', 'lzma' or
+    'zstd') shrinks the data first, so fewer frames carry it.
+    """
+    require_lossless(codec, "Byte payloads")
+    flags = FLAG_BYTES
+    if compression:
+        data, compression_flag = compress(data, compression, compression_level)
+        flags |= compression_flag
+
+    cap = cv2.VideoCapture(video_path)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    transform = BlockDCT(block_size)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    per_frame = frame_bit_capacity((height, width), transform)
+    chunks = -(-len(bits) // per_frame)
+    if frame_count > 0 and chunks > frame_count - 1:
+        cap.release()
+        raise Exception(f"The payload needs {chunks} carrier frames, the video only has {max(frame_count - 1, 0)}")
+
+    # bits_per_channel records the bits each block of a plane carries
+    payload_header = PayloadHeader(METHOD_DCT, len(BLOCK_POSITIONS), 0, 0, 0,
+                                   payload_length=len(data), first_frame=1, frame_count=chunks,
+                                   flags=flags, payload_crc=zlib.crc32(data))
+
+    out = open_writer(output_path, codec, fps, (width, height))
+    frame_index = 0
+    try:
+        while True:
+            with timing.stage(timing.DECODE):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            if frame_index == 0:
+                write_header(frame, payload_header)
+            elif frame_index <= chunks:
+                embed_frame_bits(frame, bits[(frame_index - 1) * per_frame:frame_index * per_frame], transform)
+            with timing.stage(timing.ENCODE):
+                out.write(frame)
+            frame_index += 1
+            if progress_callback and frame_count:
+                progress_callback(min(frame_index / frame_count * 100, 100))
+    finally:
+        cap.release()
+        out.release()
+    if frame_index <= chunks:
+        raise Exception(f"The video ended after {frame_index} frames, before the payload did")
+
+
+def extract_bytes(video_path, block_size=8, progress_callback=None):
+    """Recover bytes hidden by embed_bytes, as (data, checksum_ok).
+
+    `progress_callback` gets the percentage of carrier frames read after each one.
+    """
+    transform = BlockDCT(block_size)
+    with FrameReader(video_path, indexed=True) as reader:
+        frame = reader.read(0)
+        header = read_header(frame) if frame is not None else None
+        if header is None or header.method != METHOD_DCT or not header.flags & FLAG_BYTES:
+            raise Exception("The video carries no DCT byte payload")
+
+        remaining = header.payload_length * 8
+        parts = []
+        for frame_index in header.carrier_frames():
+            with timing.stage(timing.DECODE):
+                frame = reader.read(frame_index)
+            if frame is None:
+                raise Exception(f"Could not read carrier frame {frame_index}")
+            count = min(remaining, frame_bit_capacity(frame.shape, transform))
+            parts.append(extract_frame_bits(frame, count, transform))
+            remaining -= count
+            if progress_callback:
+                progress_callback(len(parts) / header.frame_count * 100)
+
+    data = np.packbits(np.concatenate(parts)).tobytes() if parts else b''
+    checksum_ok = zlib.crc32(data) == header.payload_crc
+    return decompress(data, header.flags), checksum_ok
@@ -0,0 +1,138 @@
+"""Decode-once, memory-mapped frame cache for repeated embeds on one cover.
+
+An embed that finds no entry for its cover decodes it as usual and writes
+each decoded frame (resized to the embed's frame size, if any) to a raw
+uint8 file of shape (frames, height, width, 3) on the way; see
+FrameCache.writer. Later embeds map that file instead of running the
+decoder at all. Entries are keyed by the video's path, size and
+modification time plus the frame geometry, and the least recently used
+ones are evicted to stay under a disk budget.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+DEFAULT_BUDGET = 2 * 1024 ** 3  # bytes
+
+
+def default_directory():
+    return os.environ.get('STEGO_FRAME_CACHE') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'stego', 'frames')
+
+
+class CacheWriter:
+    """Frames written to a new cache entry; nothing is visible until `commit`."""
+
+    def __init__(self, cache, video_path, raw_path, meta_path, size):
+        self.cache = cache
+        self.video_path = video_path
+        self.raw_path = raw_path
+        self.meta_path = meta_path
+        self.size = size
+        self.frames = 0
+        # Written under a temporary name and renamed into place, so other
+        # processes never map a half-written entry
+        fd, self.tmp_path = tempfile.mkstemp(dir=cache.directory, suffix='.part')
+        self.file = os.fdopen(fd, 'wb')
+
+    def write(self, frame):
+        self.file.write(np.ascontiguousarray(frame).data)
+        self.frames += 1
+
+    def commit(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.raw_path)
+        meta = {'video': os.path.abspath(self.video_path), 'frames': self.frames,
+                'shape': [self.frames, self.size[1], self.size[0], 3]}
+        fd, tmp_meta = tempfile.mkstemp(dir=self.cache.directory, suffix='.part')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, self.meta_path)
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.unlink(self.tmp_path)
+        except OSError:
+            pass
+
+
+class FrameCache:
+    """Cache of decoded covers under `directory`, using at most `budget` bytes of disk."""
+
+    def __init__(self, directory=None, budget=DEFAULT_BUDGET):
+        self.directory = directory or default_directory()
+        self.budget = budget
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, video_path, frame_size=None):
+        # A changed or replaced file gets a new size or mtime, and so a new key
+        stat = os.stat(video_path)
+        identity = f'{os.path.abspath(video_path)}\0{stat.st_size}\0{stat.st_mtime_ns}'
+        geometry = f'{frame_size[0]}x{frame_size[1]}' if frame_size else 'native'
+        return f'{hashlib.sha256(identity.encode()).hexdigest()[:32]}-{geometry}'
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.raw', base + '.json'
+
+    def open(self, video_path, frame_size=None):
+        """Frames of `video_path` as a read-only (n, h, w, 3) memmap, or None if it isn't cached."""
+        raw_path, meta_path = self._paths(self.key(video_path, frame_size))
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            os.utime(meta_path)  # Mark as recently used
+            if meta['frames'] == 0:
+                return np.zeros((0, 0, 0, 3), dtype=np.uint8)
+            return np.memmap(raw_path, dtype=np.uint8, mode='r', shape=tuple(meta['shape']))
+        except (OSError, ValueError):
+            # Not cached, or another process evicted the entry between the
+            # two files; the caller decodes the video instead
+            return None
+
+    def writer(self, video_path, frame_size, frame_count):
+        """A CacheWriter for `frame_count` frames of `frame_size`, or None if they wouldn't fit the budget."""
+        estimate = frame_count * frame_size[0] * frame_size[1] * 3
+        if estimate > self.budget:
+            return None
+        self.evict(self.budget - estimate)
+        raw_path, meta_path = self._paths(self.key(video_path, frame_size))
+        return CacheWriter(self, video_path, raw_path, meta_path, frame_size)
+
+    def entries(self):
+        """(last used, bytes, key) of every complete entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-len('.json')]
+            raw_path, meta_path = self._paths(key)
+            try:
+                entries.append((os.path.getmtime(meta_path), os.path.getsize(raw_path), key))
+            except OSError:
+                continue
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, target):
+        """Remove least recently used entries until the cache holds at most `target` bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= target:
+                break
+            for path in self._paths(key):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            total -= size
+
+    def clear(self):
+        self.evict(0)
@@ -0,0 +1,119 @@
+"""Persistent per-video frame index for fast random access.
+
+Scanning a video's packets once (with ffprobe, no decoding) gives every
+frame's timestamp and which frames are keyframes. The index is saved in a
+cache directory, or in a sidecar file next to the video when that isn't
+writable, and is rebuilt automatically once the video changes. FrameReader
+uses it to seek to the keyframe before frame k and decode only the frames
+in between.
+
+OpenCV seeks by frame number, converting it to a time with the nominal
+frame rate, so on variable frame rate video it can land on a neighbouring
+frame. FrameReader compares the timestamp it landed on with the indexed
+one and falls back to decoding forward when they disagree.
+"""
+import bisect
+import hashlib
+import json
+import os
+import tempfile
+
+from stego import remux
+
+VERSION = 3
+SUFFIX = '.stgidx'
+_HEAD_BYTES = 1 << 20  # Hashed along with the size and mtime to spot rewrites
+
+
+def _fingerprint(video_path):
+    stat = os.stat(video_path)
+    with open(video_path, 'rb') as f:
+        head = hashlib.sha256(f.read(_HEAD_BYTES)).hexdigest()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'head': head}
+
+
+def _cache_path(video_path):
+    directory = os.environ.get('STEGO_INDEX_CACHE') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'stego', 'index')
+    name = hashlib.sha1(os.path.abspath(video_path).encode()).hexdigest()
+    return os.path.join(directory, name + SUFFIX)
+
+
+class FrameIndex:
+    """Frame count, keyframes and timestamps of a video, with frames in presentation order."""
+
+    def __init__(self, frames, keyframes, pts, fingerprint=None):
+        self.frames = frames
+        self.keyframes = keyframes
+        self.pts = pts  # Seconds, one per frame
+        self.fingerprint = fingerprint
+
+    def keyframe_before(self, k):
+        """The last keyframe at or before frame `k`, or None if there is none."""
+        position = bisect.bisect_right(self.keyframes, k)
+        return self.keyframes[position - 1] if position else None
+
+    @classmethod
+    def build(cls, video_path):
+        """Scan `video_path` once; needs ffprobe (see stego.remux.available)."""
+        fingerprint = _fingerprint(video_path)
+        info = remux.probe(video_path)
+        return cls(info['frames'], [index for index, _ in info['keyframes']], info['pts'],
+                   fingerprint)
+
+    def save(self, path):
+        data = {'version': VERSION, 'fingerprint': self.fingerprint, 'frames': self.frames,
+                'keyframes': self.keyframes, 'pts': self.pts}
+        # A temporary file of its own, so concurrent writers never share one
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.part')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Read a saved index; raises ValueError if it isn't a current-version one."""
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != VERSION:
+            raise ValueError(f"Unsupported frame index version {data.get('version')}")
+        return cls(data['frames'], data['keyframes'], data['pts'], data['fingerprint'])
+
+
+def load_index(video_path, build=True):
+    """The index of `video_path`, building and saving it if it is missing or stale.
+
+    Returns None when there is no valid index and it can't be built (no
+    ffprobe, or `build` is False); callers then fall back to plain seeking.
+    """
+    fingerprint = _fingerprint(video_path)
+    candidates = [_cache_path(video_path), video_path + SUFFIX]
+    for path in candidates:
+        try:
+            index = FrameIndex.load(path)
+        except (OSError, ValueError, KeyError):
+            continue
+        if index.fingerprint == fingerprint:
+            return index
+
+    if not build or not remux.available():
+        return None
+    try:
+        index = FrameIndex.build(video_path)
+    except RuntimeError:
+        return None
+    for path in candidates:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            index.save(path)
+            break
+        except OSError:
+            continue
+    return index
@@ -0,0 +1,121 @@
+import struct
+import zlib
+
+import numpy as np
+
+from stego.payload import symbol_count
+from stego.permutation import KeyedPermutation
+
+MAGIC = b'STG1'
+VERSION = 1
+
+METHOD_LSB = 1
+METHOD_DCT = 2
+
+# Carrier frames are spread over `span` frames in KeyedPermutation(seed) order
+FLAG_SHUFFLED = 0x01
+# The payload is raw bytes (see stego.payload): payload_length counts bytes,
+# not symbols, and height, width and channels are 0 unless the bytes are a
+# compressed image
+FLAG_BYTES = 0x02
+# Byte payloads compressed before embedding (see stego.compression)
+FLAG_ZLIB = 0x04
+FLAG_LZMA = 0x08
+FLAG_ZSTD = 0x10
+
+# magic, version, method, bits_per_channel, flags, height, width, channels,
+# payload_length, seed, first_frame, frame_count, span, payload_crc
+_FIELDS = struct.Struct('<4sBBBBIIBQQIIII')
+_CRC = struct.Struct('<I')
+HEADER_SIZE = _FIELDS.size + _CRC.size
+HEADER_BITS = HEADER_SIZE * 8
+
+
+class PayloadHeader:
+    """Compact description of a payload, stored in the first frame.
+
+    It tells a fresh extractor everything the embedder knew: the method, bit
+    depth, secret dimensions, payload length and checksum, and which frames
+    carry the payload, so it can seek straight to them.
+    """
+
+    def __init__(self, method, bits_per_channel, height, width, channels=3, payload_length=0,
+                 seed=0, first_frame=1, frame_count=1, span=None, flags=0, payload_crc=0):
+        self.method = method
+        self.bits_per_channel = bits_per_channel
+        self.height = height
+        self.width = width
+        self.channels = channels
+        self.payload_length = payload_length
+        self.seed = seed
+        self.first_frame = first_frame
+        self.frame_count = frame_count
+        self.span = frame_count if span is None else span
+        self.flags = flags
+        self.payload_crc = payload_crc
+
+    def __repr__(self):
+        return (f"PayloadHeader(method={self.method}, bits_per_channel={self.bits_per_channel}, "
+                f"size={self.width}x{self.height}x{self.channels}, payload_length={self.payload_length}, "
+                f"frames={self.first_frame}+{self.frame_count}/{self.span}, flags={self.flags:#x})")
+
+    def pack(self):
+        fields = _FIELDS.pack(MAGIC, VERSION, self.method, self.bits_per_channel, self.flags,
+                              self.height, self.width, self.channels, self.payload_length,
+                              self.seed, self.first_frame, self.frame_count, self.span,
+                              self.payload_crc)
+        return fields + _CRC.pack(zlib.crc32(fields))
+
+    @classmethod
+    def unpack(cls, data):
+        """Parse a packed header; raises ValueError if it isn't a valid one."""
+        data = bytes(data[:HEADER_SIZE])
+        if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+            raise ValueError("No payload header found")
+        fields, (crc,) = data[:_FIELDS.size], _CRC.unpack(data[_FIELDS.size:])
+        if zlib.crc32(fields) != crc:
+            raise ValueError("Payload header is corrupt")
+
+        (_, version, method, bits_per_channel, flags, height, width, channels, payload_length,
+         seed, first_frame, frame_count, span, payload_crc) = _FIELDS.unpack(fields)
+        if version != VERSION:
+            raise ValueError(f"Unsupported payload header version {version}")
+        return cls(method, bits_per_channel, height, width, channels, payload_length, seed,
+                   first_frame, frame_count, span, flags, payload_crc)
+
+    def symbol_count(self):
+        """Carrier symbols the payload occupies."""
+        if self.flags & FLAG_BYTES:
+            return symbol_count(self.payload_length, self.bits_per_channel)
+        return self.payload_length
+
+    def carrier_frame(self, k):
+        """Frame index holding payload chunk k."""
+        if self.flags & FLAG_SHUFFLED:
+            return self.first_frame + KeyedPermutation(self.span, self.seed)[k]
+        return self.first_frame + k
+
+    def carrier_frames(self):
+        if self.flags & FLAG_SHUFFLED:
+            perm = KeyedPermutation(self.span, self.seed)
+            return [self.first_frame + perm[k] for k in range(self.frame_count)]
+        return list(range(self.first_frame, self.first_frame + self.frame_count))
+
+
+def write_header(frame, header):
+    """Store a header in the lowest bit of the first HEADER_BITS bytes of `frame`."""
+    flat = frame.reshape(-1)
+    bits = np.unpackbits(np.frombuffer(header.pack(), dtype=np.uint8))
+    flat[:HEADER_BITS] = (flat[:HEADER_BITS] & 0xFE) | bits
+    return frame
+
+
+def read_header(frame):
+    """Return the PayloadHeader stored in `frame`, or None if there isn't one."""
+    flat = frame.reshape(-1)
+    if flat.size < HEADER_BITS:
+        return None
+    try:
+        return PayloadHeader.unpack(np.packbits(flat[:HEADER_BITS] & 1).tobytes())
+    except ValueError:
+        return None
@@ -0,0 +1,106 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from stego.pipeline import PipelineCancelled
+
+# Read once: os.umask can only be queried by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def staged_output(output_path):
+    """Yield a temporary path next to `output_path` that replaces it only if the block succeeds.
+
+    The temporary file keeps the extension, so OpenCV picks the same format,
+    and is always removed on failure or cancellation; a file already at
+    `output_path` stays untouched unless the job completes.
+    """
+    directory, name = os.path.split(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{name}.', suffix=os.path.splitext(name)[1])
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, 0o666 & ~_UMASK)  # mkstemp creates it private
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+class BackgroundJob:
+    """Run an embed or extract call on a worker thread.
+
+    `target(progress_callback, cancel, output_path)` does the work; `cancel`
+    is a threading.Event the engine may watch. The output path it gets is a
+    temporary file next to `output_path` that replaces it only once the job
+    succeeds (see staged_output), so a cancelled or failed job leaves no
+    partial output and never clobbers an existing file. Progress updates are
+    coalesced to at most one every `interval` seconds and, like the final
+    outcome, handed to the owner through a thread-safe queue that a GUI
+    drains with `dispatch` from its own event loop (e.g. Tk's `root.after`).
+
+    Once cancelled, the next progress update raises PipelineCancelled inside
+    the worker, so engines that don't take `cancel` still stop promptly.
+    """
+
+    def __init__(self, target, output_path=None, interval=0.1):
+        self.target = target
+        self.output_path = output_path
+        self.interval = interval
+        self.cancel_event = threading.Event()
+        self.events = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self._last_progress = 0.0
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def running(self):
+        return self.thread.is_alive() or not self.events.empty()
+
+    def _progress(self, value):
+        if self.cancel_event.is_set():
+            raise PipelineCancelled("Operation cancelled")
+        now = time.monotonic()
+        if value >= 100 or now - self._last_progress >= self.interval:
+            self._last_progress = now
+            self.events.put(('progress', value))
+
+    def _run(self):
+        try:
+            if self.output_path:
+                with staged_output(self.output_path) as output_path:
+                    result = self.target(self._progress, self.cancel_event, output_path)
+            else:
+                result = self.target(self._progress, self.cancel_event, None)
+            self.events.put(('done', result))
+        except PipelineCancelled:
+            self.events.put(('cancelled', None))
+        except Exception as e:
+            self.events.put(('error', e))
+
+    def dispatch(self, on_progress, on_done, on_error, on_cancelled):
+        """Deliver queued events to the callbacks; returns False once finished."""
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                return self.thread.is_alive() or not self.events.empty()
+            if kind == 'progress':
+                on_progress(value)
+            elif kind == 'done':
+                on_done(value)
+            elif kind == 'error':
+                on_error(value)
+            else:
+                on_cancelled()
@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def replicate_lut(bits_per_channel):
+    """Table mapping a byte's low bits to those bits spread over a full byte.
+
+    Value v (its low `bits_per_channel` bits) becomes v shifted to the top of
+    the byte with copies ORed into the remaining low bits, exactly as the
+    per-channel loops in the GUI scripts rebuilt extracted pixels. Cached,
+    so treat the result as read-only.
+    """
+    mask = 2 ** bits_per_channel - 1
+    lut = np.empty(256, dtype=np.uint8)
+    for value in range(256):
+        bits = value & mask
+        pixel = (bits << (8 - bits_per_channel)) & 0xFF
+        for j in range(8 - bits_per_channel):
+            pixel |= (bits << j) & 0xFF
+        lut[value] = pixel
+    return lut
+
+
+class FrameRing:
+    """A fixed set of frame buffers handed out round-robin.
+
+    Safe to reuse as long as fewer than `count` frames are alive at once,
+    which a bounded pipeline guarantees (see stego.pipeline.frames_in_flight).
+    """
+
+    def __init__(self, shape, count):
+        self.buffers = [np.empty(shape, dtype=np.uint8) for _ in range(count)]
+        self.index = 0
+
+    def next(self):
+        buffer = self.buffers[self.index]
+        self.index = (self.index + 1) % len(self.buffers)
+        return buffer
+
+
+class LSBKernel:
+    """LSB embed/extract over all channels at once without per-frame allocations.
+
+    Everything that depends only on the bit depth or the frame shape (masks,
+    the replication table, scratch space) is built once; `embed` works in
+    place and `extract` writes into a caller-supplied buffer.
+    """
+
+    def __init__(self, bits_per_channel, shape):
+        self.bits_per_channel = bits_per_channel
+        self.keep = np.uint8((0xFF << bits_per_channel) & 0xFF)
+        self.mask = np.uint8(2 ** bits_per_channel - 1)
+        self.lut = replicate_lut(bits_per_channel)
+        self.scratch = np.empty(shape, dtype=np.uint8)
+
+    def secret_bits(self, secret_img):
+        """The secret's top bits, ready to OR into a frame; computed once per secret."""
+        return np.right_shift(secret_img, 8 - self.bits_per_channel)
+
+    def embed(self, frame, secret_bits):
+        np.bitwise_and(frame, self.keep, out=frame)
+        np.bitwise_or(frame, secret_bits, out=frame)
+        return frame
+
+    def extract(self, frame, out=None):
+        if out is None:
+            out = np.empty(frame.shape, dtype=np.uint8)
+        scratch = self.scratch if self.scratch.shape == frame.shape else np.empty_like(frame)
+        np.bitwise_and(frame, self.mask, out=scratch)
+        # np.take would convert the indices to intp, a temporary 8x the frame
+        result = cv2.LUT(scratch, self.lut, dst=out)
+        if result is not out:
+            np.copyto(out, result)  # OpenCV couldn't write into `out` directly
+        return out
@@ -0,0 +1,417 @@
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from stego import timing
+from stego.codecs import is_lossless, open_writer, require_lossless
+from stego.compression import compress, decompress
+from stego.frameindex import load_index
+from stego.header import (FLAG_BYTES, FLAG_SHUFFLED, METHOD_LSB, PayloadHeader, read_header,
+                          write_header)
+from stego.kernels import FrameRing, LSBKernel
+from stego.payload import bytes_to_symbols, symbol_count, symbols_to_bytes
+from stego.pipeline import PipelineCancelled, frames_in_flight, run_pipeline
+from stego.remux import smart_render
+from stego.shard import embed_sharded
+from stego.video import FrameReader
+
+
+def embed_chunk(frame, chunk, bits_per_channel):
+    """Write payload symbols into the low bits of the first bytes of `frame`, in place."""
+    flat = frame.reshape(-1)[:len(chunk)]
+    flat &= (0xFF << bits_per_channel) & 0xFF
+    flat |= chunk
+    return frame
+
+
+def read_payload(video_path, header, workers=4, progress_callback=None):
+    """Fetch the carrier frames listed in `header` concurrently and reassemble the payload.
+
+    The carriers are sorted and split into one contiguous run per worker, so
+    each worker's FrameReader only ever seeks or grabs forward. The frame
+    index is loaded (or built) once and shared by all of them.
+    `progress_callback` gets the percentage of carriers read after each one,
+    from the worker threads; an exception it raises stops every worker at
+    its next frame.
+    """
+    payload = np.empty(header.symbol_count(), dtype=np.uint8)
+    mask = 2 ** header.bits_per_channel - 1
+    carriers = sorted((frame_index, k) for k, frame_index in enumerate(header.carrier_frames()))
+    run_length = max(1, -(-len(carriers) // workers))
+    runs = [carriers[i:i + run_length] for i in range(0, len(carriers), run_length)]
+    index = load_index(video_path)
+    lock = threading.Lock()
+    done = [0]
+
+    def fetch(run):
+        with FrameReader(video_path, index=index) as reader:
+            for frame_index, k in run:
+                with timing.stage(timing.DECODE):
+                    frame = reader.read(frame_index)
+                if frame is None:
+                    raise Exception(f"Could not read carrier frame {frame_index}")
+                start = k * frame.size
+                end = min(start + frame.size, len(payload))
+                with timing.stage(timing.BITS):
+                    np.bitwise_and(frame.reshape(-1)[:end - start], mask, out=payload[start:end])
+                if progress_callback:
+                    with lock:
+                        done[0] += 1
+                        progress_callback(done[0] / len(carriers) * 100)
+
+    with ThreadPoolExecutor(max_workers=len(runs) or 1) as pool:
+        list(pool.map(fetch, runs))
+    return payload
+
+
+def fit_size(size, bounds):
+    """Largest (width, height) with the aspect ratio of `size` that fits in `bounds`; never upscales."""
+    scale = min(1.0, bounds[0] / size[0], bounds[1] / size[1])
+    return max(1, int(size[0] * scale)), max(1, int(size[1] * scale))
+
+
+class Steganography:
+    """Hide an image in the least significant bits of a video's first frame.
+
+    The GUI scripts subclass this to pick their bit depth and to add their own
+    clean-up chain as `postprocessor` (see stego.postprocess). Choosing a
+    lossless `codec` keeps the embedded bits intact, and extraction then skips
+    post-processing entirely, as it does when the header checksum verifies.
+
+    With `use_header`, frame 0 carries a PayloadHeader and the secret is
+    stored at its own size, split across as many frames as it needs (in
+    KeyedPermutation order when `shuffle_seed` is set). Any extractor can then
+    recover the layout, bit depth and checksum without being told, and fetches
+    the carrier frames with `extract_workers` threads.
+
+    `embed_bytes` hides arbitrary bytes the same way, always with a header,
+    and `extract_bytes` (or `extract_data`, which then writes the bytes out
+    as they are) recovers them exactly. Setting `compression` shrinks header
+    payloads, and with them the number of carrier frames, before embedding.
+
+    With `frame_size=None` frames keep their decoded resolution. The secret is
+    then stored at its own size in the top-left corner of frame 0, shrunk
+    once (keeping its aspect ratio) only if it doesn't fit.
+
+    Setting `shard_workers` splits long covers into keyframe-aligned
+    segments embedded by that many processes and joined without re-encoding
+    (see stego.shard); it needs ffmpeg.
+    """
+
+    def __init__(self, bits_per_channel=6, frame_size=(640, 480)):
+        self.frame_size = frame_size  # Default frame size, None for native resolution
+        self.bits_per_channel = bits_per_channel
+        self.original_image_size = None  # To store original image size
+        self.last_stats = None  # PipelineStats of the last embed
+        self.smart_render = False  # Re-encode only the first GOP, copy the rest
+        self.codec = 'mp4v'  # Output writer, see stego.codecs.CODECS
+        self.resize_interpolation = None  # Set to restore the original image size
+        self.use_header = False  # Describe the payload in frame 0
+        self.last_checksum_ok = None  # Whether the last extraction matched the header checksum
+        self.shuffle_seed = None  # Spread carrier frames in permuted order
+        self.extract_workers = 4  # Threads decoding carrier frames
+        self.postprocessor = None  # PostProcessor run on lossy extractions
+        self.compression = None  # Header payloads: 'zlib', 'lzma' or 'zstd', see stego.compression
+        self.compression_level = None  # None for the method's default
+        self.frame_cache = None  # stego.framecache.FrameCache to decode each cover only once
+        self.shard_workers = None  # Processes embedding time segments in parallel, see stego.shard
+
+    def embed_data(self, video_path, image_path, output_path, progress_callback, cancel=None):
+        return self._embed(video_path, output_path, progress_callback, cancel, image_path=image_path)
+
+    def embed_bytes(self, video_path, data, output_path, progress_callback=None, cancel=None):
+        """Hide arbitrary bytes (a file's contents, say) behind a payload header."""
+        return self._embed(video_path, output_path, progress_callback, cancel, data=bytes(data))
+
+    def _embed(self, video_path, output_path, progress_callback, cancel, image_path=None, data=None):
+        try:
+            # Open video and image
+            video = cv2.VideoCapture(video_path)
+            if data is None:
+                secret_img = cv2.imread(image_path)
+
+                # Save the original image size for later extraction
+                self.original_image_size = secret_img.shape[:2]  # height, width
+
+            # Get video properties
+            fps = int(video.get(cv2.CAP_PROP_FPS))
+            frame_count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+            source_size = (int(video.get(cv2.CAP_PROP_FRAME_WIDTH)), int(video.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            frame_size = tuple(self.frame_size or source_size)
+            width, height = frame_size
+
+            header = None
+            last_frame = 0  # Embed in first frame only
+            if self.use_header or data is not None:
+                # Smart render re-encodes with the source codec instead
+                if not self.smart_render:
+                    require_lossless(self.codec, "Header and byte payloads")
+                elif not is_lossless(video_path):
+                    raise Exception("Header and byte payloads need a lossless source video for smart render")
+
+                # Frame 0 holds the header; the secret keeps its own size and
+                # is split across as many of the following frames as it needs
+                flags = 0
+                shape = (0, 0, 0) if data is not None else secret_img.shape
+                if data is None:
+                    payload = (secret_img >> (8 - self.bits_per_channel)).reshape(-1)
+                    if self.compression:
+                        # A compressed image travels as bytes, keeping its shape
+                        packed, flags = compress(payload.tobytes(), self.compression, self.compression_level)
+                        if flags and symbol_count(len(packed), self.bits_per_channel) < payload.size:
+                            data = packed
+                        else:
+                            flags = 0
+                elif self.compression:
+                    data, flags = compress(data, self.compression, self.compression_level)
+
+                if data is not None:
+                    payload = bytes_to_symbols(data, self.bits_per_channel)
+                    flags |= FLAG_BYTES
+                    length, crc = len(data), zlib.crc32(data)
+                else:
+                    length, crc = payload.size, zlib.crc32(payload)
+                if self.shuffle_seed is not None:
+                    flags |= FLAG_SHUFFLED
+                capacity = width * height * 3
+                chunks = -(-payload.size // capacity)
+                span = frame_count - 1 if self.shuffle_seed is not None else chunks
+                if chunks > span or (frame_count > 0 and chunks > frame_count - 1):
+                    raise Exception(f"The secret needs {chunks} carrier frames, "
+                                    f"the video only has {max(frame_count - 1, 0)}")
+                header = PayloadHeader(METHOD_LSB, self.bits_per_channel, *shape,
+                                       payload_length=length, seed=self.shuffle_seed or 0,
+                                       first_frame=1, frame_count=chunks, span=span,
+                                       flags=flags, payload_crc=crc)
+                carriers = {frame_index: k for k, frame_index in enumerate(header.carrier_frames())}
+                last_frame = max(carriers)
+            elif self.frame_size is None:
+                # Keep the secret's own size unless it is larger than a frame
+                fitted = fit_size(secret_img.shape[1::-1], frame_size)
+                if fitted != secret_img.shape[1::-1]:
+                    secret_img = cv2.resize(secret_img, fitted, interpolation=cv2.INTER_AREA)
+            else:
+                # Resize secret image to match frame size
+                secret_img = cv2.resize(secret_img, frame_size)
+
+            # Masks and the secret's top bits are prepared once, not per frame
+            if header is None:
+                kernel = LSBKernel(self.bits_per_channel, secret_img.shape)
+                secret_bits = kernel.secret_bits(secret_img)
+                secret_height, secret_width = secret_img.shape[:2]
+
+            def transform(index, frame):
+                if index != 0 and (header is None or index not in carriers):
+                    return frame
+                if not frame.flags.writeable:
+                    # A cached frame is a read-only view of the memory map
+                    frame = np.array(frame)
+                with timing.stage(timing.BITS):
+                    if header is None:
+                        kernel.embed(frame[:secret_height, :secret_width], secret_bits)
+                    elif index == 0:
+                        write_header(frame, header)
+                    else:
+                        start = carriers[index] * capacity
+                        embed_chunk(frame, payload[start:start + capacity], self.bits_per_channel)
+                return frame
+
+            if self.smart_render:
+                # Only the first GOP is re-encoded, so frames can't be resized
+                video.release()
+                if source_size != frame_size:
+                    raise Exception(f"Smart render needs a {self.frame_size[0]}x{self.frame_size[1]} video")
+                smart_render(video_path, output_path, transform, last_frame, progress_callback)
+                return True
+
+            if self.shard_workers:
+                # Each segment process is sent only the edits for its frames
+                video.release()
+                if header is None:
+                    edits = {0: [('lsb-bits', (secret_bits, self.bits_per_channel))]}
+                else:
+                    edits = {0: [('header', (header.pack(),))]}
+                    for frame_index, k in carriers.items():
+                        chunk = payload[k * capacity:(k + 1) * capacity]
+                        edits[frame_index] = [('lsb-chunk', (chunk, self.bits_per_channel))]
+                self.last_stats = embed_sharded(video_path, output_path, edits, self.shard_workers,
+                                                self.codec, fps, self.frame_size, progress_callback, cancel)
+                return True
+
+            # Setup video writer
+            out = open_writer(output_path, self.codec, fps, frame_size)
+
+            def write(frame):
+                with timing.stage(timing.ENCODE):
+                    out.write(frame)
+
+            # A cached cover is read straight from its memory map, untouched
+            # frames going to the writer without a copy
+            cached = self.frame_cache.open(video_path, frame_size) if self.frame_cache else None
+            if cached is not None:
+                video.release()
+                frames = iter(cached)
+
+                def read():
+                    with timing.stage(timing.DECODE):
+                        return next(frames, None)
+
+                try:
+                    self.last_stats = run_pipeline(read, transform, write,
+                                                   progress_callback, len(cached), cancel)
+                finally:
+                    out.release()
+                return True
+
+            # Decode and resize into reused buffers; the ring is large enough
+            # that no buffer is handed out again before its frame is written
+            ring = FrameRing((height, width, 3), frames_in_flight() + 1)
+            decoded = np.empty((source_size[1], source_size[0], 3), dtype=np.uint8)
+
+            # Fill the cache with the decoded frames on the way, before any
+            # are modified; it only becomes visible once the embed finishes
+            fill = self.frame_cache.writer(video_path, frame_size, frame_count) if self.frame_cache else None
+
+            def decode():
+                nonlocal decoded
+                if source_size == frame_size:
+                    with timing.stage(timing.DECODE):
+                        ret, frame = video.read(ring.next())
+                    return frame if ret else None
+                with timing.stage(timing.DECODE):
+                    ret, decoded = video.read(decoded)
+                if not ret:
+                    return None
+                # Resize frame to match desired size
+                with timing.stage(timing.RESIZE):
+                    return cv2.resize(decoded, frame_size, dst=ring.next())
+
+            def read():
+                frame = decode()
+                if frame is not None and fill is not None:
+                    fill.write(frame)
+                return frame
+
+            try:
+                self.last_stats = run_pipeline(read, transform, write,
+                                               progress_callback, frame_count, cancel)
+            except BaseException:
+                if fill is not None:
+                    fill.abort()
+                raise
+            finally:
+                video.release()
+                out.release()
+            if fill is not None:
+                fill.commit()
+            return True
+
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            raise Exception(f"Embedding failed: {str(e)}")
+
+    def extract_data(self, stego_video_path, output_path, progress_callback):
+        try:
+            # Open stego video
+            reader = FrameReader(stego_video_path)
+
+            # Read first frame
+            with timing.stage(timing.DECODE):
+                frame = reader.read(0)
+            if frame is None:
+                raise Exception("Could not read video file")
+
+            # A header says where the payload is; fetch only those frames
+            bits_per_channel = self.bits_per_channel
+            self.last_checksum_ok = None
+            header = read_header(frame)
+            reader.release()
+            if header is not None and header.method == METHOD_LSB and header.flags & FLAG_BYTES:
+                data = self._read_bytes(stego_video_path, header, progress_callback)
+                if not header.channels:
+                    # Raw bytes are saved exactly as they were embedded
+                    with open(output_path, 'wb') as f:
+                        f.write(data)
+                    progress_callback(100)
+                    return True
+
+                # A compressed image payload
+                bits_per_channel = header.bits_per_channel
+                self.original_image_size = (header.height, header.width)
+                frame = np.frombuffer(data, dtype=np.uint8).reshape(header.height, header.width, header.channels)
+            elif header is not None and header.method == METHOD_LSB:
+                bits_per_channel = header.bits_per_channel
+                self.original_image_size = (header.height, header.width)
+                payload = read_payload(stego_video_path, header, self.extract_workers,
+                                       progress_callback)
+                self.last_checksum_ok = zlib.crc32(payload) == header.payload_crc
+                frame = payload.reshape(header.height, header.width, header.channels)
+            elif self.frame_size is None:
+                # Native resolution: the secret sits in the top-left corner
+                if self.original_image_size:
+                    fitted = fit_size(self.original_image_size[::-1], frame.shape[1::-1])
+                    frame = frame[:fitted[1], :fitted[0]]
+            elif frame.shape[1::-1] != tuple(self.frame_size):
+                # Resize frame if necessary
+                with timing.stage(timing.RESIZE):
+                    frame = cv2.resize(frame, self.frame_size)
+
+            # Extract hidden image from the low bits
+            with timing.stage(timing.BITS):
+                extracted_img = LSBKernel(bits_per_channel, frame.shape).extract(frame)
+
+            # A verified checksum or a lossless stream means the bits are
+            # exact; nothing to clean up
+            if not self.last_checksum_ok and not is_lossless(stego_video_path):
+                with timing.stage(timing.POSTPROCESS):
+                    extracted_img = self.postprocess(extracted_img)
+
+            # Resize the extracted image to match the original image size
+            if (self.resize_interpolation is not None and self.original_image_size
+                    and extracted_img.shape[:2] != tuple(self.original_image_size)):
+                with timing.stage(timing.RESIZE):
+                    extracted_img = cv2.resize(extracted_img, (self.original_image_size[1], self.original_image_size[0]),
+                                               interpolation=self.resize_interpolation)
+
+            # Save extracted image
+            with timing.stage(timing.ENCODE):
+                cv2.imwrite(output_path, extracted_img)
+
+            progress_callback(100)  # Operation complete
+            return True
+
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            raise Exception(f"Extraction failed: {str(e)}")
+
+    def extract_bytes(self, stego_video_path):
+        """Return the bytes hidden by embed_bytes; `last_checksum_ok` says whether they verified."""
+        try:
+            with FrameReader(stego_video_path) as reader:
+                frame = reader.read(0)
+            if frame is None:
+                raise Exception("Could not read video file")
+            header = read_header(frame)
+            if header is None or header.method != METHOD_LSB or not header.flags & FLAG_BYTES:
+                raise Exception("The video carries no byte payload")
+            return self._read_bytes(stego_video_path, header)
+
+        except Exception as e:
+            raise Exception(f"Extraction failed: {str(e)}")
+
+    def _read_bytes(self, stego_video_path, header, progress_callback=None):
+        payload = read_payload(stego_video_path, header, self.extract_workers, progress_callback)
+        data = symbols_to_bytes(payload, header.bits_per_channel, header.payload_length)
+        self.last_checksum_ok = zlib.crc32(data) == header.payload_crc
+        return decompress(data, header.flags)
+
+    def postprocess(self, extracted_img):
+        """Clean up an extracted image before it is saved with `postprocessor`, if any."""
+        if self.postprocessor is None:
+            return extracted_img
+        return self.postprocessor(extracted_img)
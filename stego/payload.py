@@ -0,0 +1,38 @@
+"""Conversion between arbitrary bytes and carrier symbols.
+
+A symbol is the value stored in the low `bits_per_channel` bits of one
+carrier byte. Bytes are unpacked to a bit stream, cut into groups of
+`bits_per_channel` bits (most significant first) and packed back into one
+symbol per group, all with whole-buffer np.unpackbits/np.packbits calls.
+"""
+import numpy as np
+
+
+def symbol_count(length, bits_per_channel):
+    """Symbols needed to carry `length` bytes."""
+    return -(-length * 8 // bits_per_channel)
+
+
+def bytes_to_symbols(data, bits_per_channel):
+    """Split `data` into a uint8 array of `bits_per_channel`-bit symbols, zero-padded at the end."""
+    data = np.frombuffer(data, dtype=np.uint8)
+    if bits_per_channel == 8:
+        return data.copy()
+    count = symbol_count(len(data), bits_per_channel)
+
+    bits = np.zeros(count * bits_per_channel, dtype=np.uint8)
+    bits[:len(data) * 8] = np.unpackbits(data)
+
+    # Right-align each group in an 8-bit row so packbits yields its value
+    rows = np.zeros((count, 8), dtype=np.uint8)
+    rows[:, 8 - bits_per_channel:] = bits.reshape(count, bits_per_channel)
+    return np.packbits(rows, axis=1).reshape(-1)
+
+
+def symbols_to_bytes(symbols, bits_per_channel, length):
+    """Reassemble `length` bytes from symbols produced by bytes_to_symbols."""
+    symbols = np.asarray(symbols, dtype=np.uint8)[:symbol_count(length, bits_per_channel)]
+    if bits_per_channel == 8:
+        return symbols.tobytes()
+    bits = np.unpackbits(symbols[:, None], axis=1)[:, 8 - bits_per_channel:]
+    return np.packbits(bits.reshape(-1)[:length * 8]).tobytes()
@@ -0,0 +1,123 @@
+import random
+
+import numpy as np
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def fisher_yates_shuffle(data, seed):
+    """Shuffle `data` in place exactly as the original extract_6.py did.
+
+    Stego videos produced so far depend on this ordering, so it keeps the
+    `random.seed(seed)` / `randint` sequence, but on a private generator
+    rather than reseeding the global `random` module.
+    """
+    rng = random.Random(seed)
+    for i in range(len(data) - 1, 0, -1):
+        j = rng.randint(0, i)
+        data[i], data[j] = data[j], data[i]
+    return data
+
+
+def legacy_permutation(n, seed=42):
+    """Full permutation of range(n) in the original `random.seed(42)` order."""
+    return fisher_yates_shuffle(list(range(n)), seed)
+
+
+def permutation(n, seed):
+    """Full permutation of range(n) as an int64 array, shuffled by NumPy."""
+    return np.random.default_rng(seed).permutation(n)
+
+
+def _mix(x):
+    # splitmix64 finaliser on a Python int
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _mix_array(x):
+    # Same finaliser on a uint64 array; multiplication wraps modulo 2**64
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class KeyedPermutation:
+    """Random-access permutation of range(n) in O(1) memory.
+
+    A small Feistel network over the next power-of-four domain is a keyed
+    bijection; values that fall outside range(n) are walked through the
+    network again until they land inside it. `perm[k]` answers "which
+    frame/coefficient holds payload slot k" without building the whole
+    permutation, and `perm.inverse(i)` answers the opposite question.
+    """
+
+    def __init__(self, n, seed, rounds=4):
+        if n < 1:
+            raise ValueError("Permutation size must be positive")
+        self.n = n
+        self.rounds = rounds
+        self.half_bits = max(1, ((n - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        base = _mix((seed * _GOLDEN) & _MASK64)
+        self.keys = [_mix((base + r * _GOLDEN) & _MASK64) for r in range(rounds)]
+
+    def __len__(self):
+        return self.n
+
+    def _encrypt(self, x):
+        left, right = x >> self.half_bits, x & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ (_mix(right ^ key) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def _decrypt(self, x):
+        left, right = x >> self.half_bits, x & self.half_mask
+        for key in reversed(self.keys):
+            left, right = right ^ (_mix(left ^ key) & self.half_mask), left
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, k):
+        if not 0 <= k < self.n:
+            raise IndexError("permutation index out of range")
+        x = self._encrypt(k)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
+
+    def __iter__(self):
+        return (self[k] for k in range(self.n))
+
+    def inverse(self, i):
+        """Return the slot k for which perm[k] == i."""
+        if not 0 <= i < self.n:
+            raise IndexError("permutation value out of range")
+        x = self._decrypt(i)
+        while x >= self.n:
+            x = self._decrypt(x)
+        return x
+
+    def take(self, slots):
+        """Vectorised perm[k] for an array of slots."""
+        slots = np.asarray(slots, dtype=np.uint64)
+        if slots.size and int(slots.max()) >= self.n:
+            raise IndexError("permutation index out of range")
+
+        shift = np.uint64(self.half_bits)
+        mask = np.uint64(self.half_mask)
+        keys = [np.uint64(key) for key in self.keys]
+
+        def encrypt(x):
+            left, right = x >> shift, x & mask
+            for key in keys:
+                left, right = right, left ^ (_mix_array(right ^ key) & mask)
+            return (left << shift) | right
+
+        result = encrypt(slots)
+        outside = result >= np.uint64(self.n)
+        while outside.any():
+            result[outside] = encrypt(result[outside])
+            outside = result >= np.uint64(self.n)
+        return result.astype(np.int64)
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+
+# Marks the end of the stream on a stage queue
+_DONE = object()
+
+
+class PipelineCancelled(Exception):
+    """Raised when a pipeline run is cancelled before it finishes."""
+
+
+class PipelineStats:
+    def __init__(self, frames, seconds):
+        self.frames = frames
+        self.seconds = seconds
+
+    @property
+    def fps(self):
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return f"PipelineStats(frames={self.frames}, seconds={self.seconds:.3f}, fps={self.fps:.1f})"
+
+
+def frames_in_flight(queue_size=8):
+    """Most frames a run_pipeline call holds at once: both queues plus one per stage."""
+    return 2 * queue_size + 3
+
+
+def run_pipeline(read, transform, write, progress_callback=None, total=None, cancel=None,
+                 queue_size=8):
+    """Run decode, transform and encode as three overlapping stages.
+
+    `read()` returns the next frame, or None at the end of the video, and runs
+    on a decoder thread. `write(frame)` runs on an encoder thread.
+    `transform(index, frame)` returns the frame to write and runs on the
+    calling thread, which also calls `progress_callback` with a percentage of
+    `total`, so GUI callbacks stay on the thread that started the job.
+
+    The stages are joined by bounded FIFO queues, so frames keep their order
+    and memory stays bounded. The first exception raised by any stage stops
+    the others and is re-raised here. Setting `cancel` (a threading.Event)
+    stops every stage and raises PipelineCancelled.
+
+    Returns a PipelineStats with the number of frames written and the
+    measured frames per second.
+    """
+    cancel = cancel or threading.Event()
+    stop = threading.Event()
+    errors = []
+    written = [0]
+    decoded = queue.Queue(queue_size)
+    encoded = queue.Queue(queue_size)
+
+    def stopped():
+        return stop.is_set() or cancel.is_set()
+
+    def fail(error):
+        errors.append(error)
+        stop.set()
+
+    def put(stage_queue, item):
+        while not stopped():
+            try:
+                stage_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(stage_queue):
+        while True:
+            try:
+                return stage_queue.get(timeout=0.1)
+            except queue.Empty:
+                if stopped():
+                    return _DONE
+
+    def decoder():
+        try:
+            while not stopped():
+                frame = read()
+                if frame is None:
+                    break
+                if not put(decoded, frame):
+                    return
+            put(decoded, _DONE)
+        except BaseException as e:
+            fail(e)
+
+    def encoder():
+        try:
+            while True:
+                frame = get(encoded)
+                if frame is _DONE or stopped():
+                    break
+                write(frame)
+                written[0] += 1
+        except BaseException as e:
+            fail(e)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=decoder, name="pipeline-decode", daemon=True),
+               threading.Thread(target=encoder, name="pipeline-encode", daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        index = 0
+        while True:
+            frame = get(decoded)
+            if frame is _DONE:
+                break
+            frame = transform(index, frame)
+            index += 1
+            if not put(encoded, frame):
+                break
+            if progress_callback and total:
+                progress_callback(min(index / total * 100, 100))
+        put(encoded, _DONE)
+    except BaseException as e:
+        fail(e)
+    finally:
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    if cancel.is_set():
+        raise PipelineCancelled("Operation cancelled")
+    return PipelineStats(written[0], time.perf_counter() - start)
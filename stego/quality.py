@@ -0,0 +1,263 @@
+"""Cover vs stego quality analysis: per-frame PSNR, SSIM and payload bit-error rate.
+
+Both videos are decoded in lockstep, a batch of frames at a time, and every
+metric is computed for the whole batch with array operations. Long videos
+can be split into contiguous segments analysed by separate processes.
+"""
+import csv
+import math
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from stego.compression import compress, decompress, method_of
+from stego.header import FLAG_BYTES, METHOD_LSB, read_header
+from stego.lsb import fit_size, read_payload
+from stego.payload import bytes_to_symbols, symbols_to_bytes
+from stego.video import FrameReader
+
+# SSIM constants for 8-bit data, and its uniform window size
+_C1 = (0.01 * 255) ** 2
+_C2 = (0.03 * 255) ** 2
+SSIM_WINDOW = 7
+
+# BT.601 luma weights in BGR order
+_LUMA = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def psnr_batch(cover, stego):
+    """PSNR in dB of each frame pair in two (n, h, w, c) uint8 batches; inf when identical."""
+    diff = cover.astype(np.float32) - stego
+    mse = np.mean(diff * diff, axis=(1, 2, 3), dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        return 10 * np.log10(255.0 ** 2 / mse)
+
+
+def _window_mean(x, k):
+    """Mean over every k x k window of a (n, h, w) batch, via a summed-area table."""
+    table = np.zeros((x.shape[0], x.shape[1] + 1, x.shape[2] + 1))
+    np.cumsum(np.cumsum(x, axis=1, dtype=np.float64), axis=2, out=table[:, 1:, 1:])
+    window = table[:, k:, k:] - table[:, :-k, k:] - table[:, k:, :-k] + table[:, :-k, :-k]
+    return window / (k * k)
+
+
+def ssim_batch(cover, stego, window=SSIM_WINDOW):
+    """Mean SSIM of the luma of each frame pair, with a uniform `window` x `window` window.
+
+    Frames smaller than the window are compared over a window as large as
+    their shorter side.
+    """
+    x = cover @ _LUMA
+    y = stego @ _LUMA
+    window = max(1, min(window, x.shape[1], x.shape[2]))
+    mu_x = _window_mean(x, window)
+    mu_y = _window_mean(y, window)
+    var_x = _window_mean(x * x, window) - mu_x * mu_x
+    var_y = _window_mean(y * y, window) - mu_y * mu_y
+    cov = _window_mean(x * y, window) - mu_x * mu_y
+
+    ssim = ((2 * mu_x * mu_y + _C1) * (2 * cov + _C2)
+            / ((mu_x * mu_x + mu_y * mu_y + _C1) * (var_x + var_y + _C2)))
+    return ssim.mean(axis=(1, 2))
+
+
+def bit_errors(stego_frame, expected, bits_per_channel):
+    """Payload bits in the low bits of `stego_frame` that differ from `expected` symbols.
+
+    A flat `expected` covers the frame from its first byte on; an (h, w, c)
+    one covers its top-left h x w corner.
+    """
+    mask = 2 ** bits_per_channel - 1
+    if expected.ndim == 3:
+        height, width = expected.shape[:2]
+        flat = stego_frame[:height, :width].reshape(-1)
+        expected = expected.reshape(-1)
+    else:
+        flat = stego_frame.reshape(-1)[:len(expected)]
+    return int(np.unpackbits((flat & mask) ^ expected).sum())
+
+
+def _stored_bytes(stego_video_path, header, original):
+    """The compressed bytes an embed stored for `original`, per the header flags.
+
+    The compression level isn't recorded, so the stored bytes are used when
+    they verify and decompress to `original`; otherwise `original` is
+    compressed again at the method's default level.
+    """
+    data = symbols_to_bytes(read_payload(stego_video_path, header), header.bits_per_channel,
+                            header.payload_length)
+    if zlib.crc32(data) == header.payload_crc:
+        try:
+            if decompress(data, header.flags) == original:
+                return data
+        except Exception:
+            pass
+    packed, _ = compress(original, method_of(header.flags))
+    return packed
+
+
+def expected_payload(stego_video_path, secret_path, bits_per_channel=6, frame_size=(640, 480)):
+    """What an LSB embed stored, as ({frame index: symbols}, bits_per_channel).
+
+    A payload header in frame 0 gives the layout, bit depth and compression
+    (and says whether the secret file was embedded as raw bytes); otherwise
+    the legacy layout is assumed: the secret resized to `frame_size` in frame
+    0, or, when the stego video has another size, kept at its own size in
+    the top-left corner as native embeds store it. A DCT header gives no
+    payload: its bits aren't stored in the low bits.
+    """
+    with FrameReader(stego_video_path) as reader:
+        frame = reader.read(0)
+    if frame is None:
+        raise Exception("Could not read video file")
+
+    header = read_header(frame)
+    if header is not None and header.method != METHOD_LSB:
+        return {}, bits_per_channel
+    if header is None:
+        secret = cv2.imread(secret_path)
+        if secret is None:
+            raise Exception(f"Could not read {secret_path}")
+        stego_size = frame.shape[1::-1]
+        if frame_size is not None and stego_size == tuple(frame_size):
+            secret = cv2.resize(secret, stego_size)
+        else:
+            fitted = fit_size(secret.shape[1::-1], stego_size)
+            if fitted != secret.shape[1::-1]:
+                secret = cv2.resize(secret, fitted, interpolation=cv2.INTER_AREA)
+        return {0: secret >> (8 - bits_per_channel)}, bits_per_channel
+
+    bits_per_channel = header.bits_per_channel
+    if header.flags & FLAG_BYTES and not header.channels:
+        # A byte payload: the secret file is compared as it is
+        with open(secret_path, 'rb') as f:
+            data = f.read()
+    else:
+        secret = cv2.imread(secret_path)
+        if secret is None:
+            raise Exception(f"Could not read {secret_path}")
+        data = None
+        payload = (secret >> (8 - bits_per_channel)).reshape(-1)
+        if header.flags & FLAG_BYTES:
+            # An image compressed as bytes, see Steganography._embed
+            data = payload.tobytes()
+    if data is not None:
+        if method_of(header.flags):
+            data = _stored_bytes(stego_video_path, header, data)
+        payload = bytes_to_symbols(data, bits_per_channel)
+    capacity = frame.size
+    return {frame_index: payload[k * capacity:(k + 1) * capacity]
+            for k, frame_index in enumerate(header.carrier_frames())}, bits_per_channel
+
+
+def analyze_segment(cover_path, stego_path, start, stop, batch_size=8, payload=None,
+                    bits_per_channel=None):
+    """Per-frame metrics for frames [start, stop) as a list of dicts.
+
+    Cover frames are resized to the stego frame size when they differ, as
+    the embedder did. Frames in `payload` ({frame index: symbols}) also get
+    their bit-error count and rate.
+    """
+    payload = payload or {}
+    rows = []
+    cover_batch = stego_batch = None
+    with FrameReader(cover_path) as cover_reader, FrameReader(stego_path) as stego_reader:
+        index = start
+        while index < stop:
+            count = 0
+            while count < batch_size and index + count < stop:
+                cover = cover_reader.read(index + count)
+                stego = stego_reader.read(index + count)
+                if cover is None or stego is None:
+                    stop = index + count
+                    break
+                if stego_batch is None:
+                    stego_batch = np.empty((batch_size,) + stego.shape, dtype=np.uint8)
+                    cover_batch = np.empty_like(stego_batch)
+                if cover.shape != stego.shape:
+                    cover = cv2.resize(cover, stego.shape[1::-1])
+                cover_batch[count] = cover
+                stego_batch[count] = stego
+                count += 1
+            if count == 0:
+                break
+
+            psnr = psnr_batch(cover_batch[:count], stego_batch[:count])
+            ssim = ssim_batch(cover_batch[:count], stego_batch[:count])
+            for offset in range(count):
+                frame_index = index + offset
+                row = {'frame': frame_index, 'psnr': float(psnr[offset]),
+                       'ssim': float(ssim[offset]), 'bit_errors': None, 'payload_bits': None,
+                       'ber': None}
+                if frame_index in payload:
+                    expected = payload[frame_index]
+                    errors = bit_errors(stego_batch[offset], expected, bits_per_channel)
+                    total = expected.size * bits_per_channel
+                    row.update(bit_errors=errors, payload_bits=total, ber=errors / total)
+                rows.append(row)
+            index += count
+    return rows
+
+
+def _analyze_segment(args):
+    return analyze_segment(*args)
+
+
+def analyze(cover_path, stego_path, workers=1, batch_size=8, secret_path=None,
+            bits_per_channel=6, frame_size=(640, 480)):
+    """Per-frame metrics for the whole video, split into `workers` segments.
+
+    With `secret_path`, frames carrying an LSB payload also report their
+    bit-error rate against the secret (see expected_payload). DCT stego
+    videos get PSNR and SSIM only: their payload is spread over transform
+    coefficients, and without a header one reads as a legacy LSB video, so
+    leave `secret_path` out for them.
+    """
+    payload, bits = {}, None
+    if secret_path:
+        payload, bits = expected_payload(stego_path, secret_path, bits_per_channel, frame_size)
+
+    with FrameReader(stego_path) as reader:
+        frame_count = reader.frame_count
+    workers = max(1, min(workers, frame_count))
+    length = max(1, -(-frame_count // workers))
+    segments = [(cover_path, stego_path, start, min(start + length, frame_count), batch_size,
+                 {k: v for k, v in payload.items() if start <= k < start + length}, bits)
+                for start in range(0, frame_count, length)]
+
+    if workers == 1:
+        results = [_analyze_segment(segment) for segment in segments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_analyze_segment, segments))
+    return [row for rows in results for row in rows]
+
+
+def summarize(rows):
+    """Whole-video figures: mean and worst PSNR (finite frames only) and SSIM, overall BER."""
+    finite = [row['psnr'] for row in rows if math.isfinite(row['psnr'])]
+    carriers = [row for row in rows if row['payload_bits']]
+    errors = sum(row['bit_errors'] for row in carriers)
+    payload_bits = sum(row['payload_bits'] for row in carriers)
+    return {
+        'frames': len(rows),
+        'identical_frames': len(rows) - len(finite),
+        'psnr_mean': sum(finite) / len(finite) if finite else math.inf,
+        'psnr_min': min(finite) if finite else math.inf,
+        'ssim_mean': sum(row['ssim'] for row in rows) / len(rows) if rows else None,
+        'ssim_min': min((row['ssim'] for row in rows), default=None),
+        'carrier_frames': len(carriers),
+        'bit_errors': errors if carriers else None,
+        'ber': errors / payload_bits if payload_bits else None,
+    }
+
+
+def write_csv(rows, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, ['frame', 'psnr', 'ssim', 'bit_errors', 'payload_bits', 'ber'])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: (f'{value:.6g}' if isinstance(value, float) else value)
+                             for key, value in row.items()})
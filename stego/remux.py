@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+import cv2
+
+from stego import timing
+
+
+def available():
+    """True when the ffmpeg and ffprobe command line tools are on PATH."""
+    return shutil.which('ffmpeg') is not None and shutil.which('ffprobe') is not None
+
+
+def _run(args):
+    result = subprocess.run(args, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def probe(video_path):
+    """Codec settings and keyframe positions of the first video stream.
+
+    Keyframes are returned as (frame_index, pts_time) pairs, with frames
+    numbered in presentation order; `pts` holds every frame's timestamp in
+    that order.
+    """
+    output = _run(['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+                   '-show_entries', 'stream=codec_name,width,height,pix_fmt,avg_frame_rate,bit_rate',
+                   '-show_entries', 'packet=pts_time,flags', '-of', 'json', video_path])
+    info = json.loads(output)
+    if not info.get('streams'):
+        raise RuntimeError(f"No video stream in {video_path}")
+    stream = info['streams'][0]
+
+    packets = [p for p in info.get('packets', []) if p.get('pts_time', 'N/A') != 'N/A']
+    packets.sort(key=lambda p: float(p['pts_time']))
+    keyframes = [(index, float(p['pts_time'])) for index, p in enumerate(packets)
+                 if 'K' in p.get('flags', '')]
+
+    return {
+        'codec': stream['codec_name'],
+        'width': int(stream['width']),
+        'height': int(stream['height']),
+        'pix_fmt': stream.get('pix_fmt', 'yuv420p'),
+        'frame_rate': stream.get('avg_frame_rate', '30/1'),
+        'bit_rate': stream.get('bit_rate'),
+        'frames': len(packets),
+        'keyframes': keyframes,
+        'pts': [float(p['pts_time']) for p in packets],
+    }
+
+
+def smart_render(video_path, output_path, transform, last_modified_frame, progress_callback=None):
+    """Re-encode only the GOPs up to `last_modified_frame`, copy the rest.
+
+    Frames before the first keyframe after `last_modified_frame` are decoded,
+    passed through `transform(index, frame)` and re-encoded with the source
+    codec and settings. Every later packet is stream-copied, so the untouched
+    part of the video costs no decoding and loses no quality. Returns the
+    number of frames that were re-encoded.
+    """
+    info = probe(video_path)
+    frame_rate_num, _, frame_rate_den = info['frame_rate'].partition('/')
+    fps = float(frame_rate_num) / float(frame_rate_den or 1) if float(frame_rate_num) else 30.0
+    split = next((kf for kf in info['keyframes'] if kf[0] > last_modified_frame), None)
+    head_frames = split[0] if split else info['frames']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        head_path = os.path.join(tmp, 'head.ts')
+        encode = ['ffmpeg', '-v', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+                  '-s', f"{info['width']}x{info['height']}", '-r', info['frame_rate'], '-i', '-',
+                  '-c:v', info['codec'], '-pix_fmt', info['pix_fmt']]
+        if info['bit_rate']:
+            encode += ['-b:v', info['bit_rate']]
+
+        with open(os.path.join(tmp, 'encode.log'), 'w+') as log:
+            encoder = subprocess.Popen(encode + [head_path], stdin=subprocess.PIPE, stderr=log)
+            video = cv2.VideoCapture(video_path)
+            try:
+                for index in range(head_frames):
+                    with timing.stage(timing.DECODE):
+                        ret, frame = video.read()
+                    if not ret:
+                        break
+                    frame = transform(index, frame)
+                    with timing.stage(timing.ENCODE):
+                        encoder.stdin.write(frame.tobytes())
+                    if progress_callback:
+                        progress_callback((index + 1) / head_frames * 100)
+            finally:
+                video.release()
+                encoder.stdin.close()
+                encoder.wait()
+            if encoder.returncode != 0:
+                log.seek(0)
+                raise RuntimeError(f"ffmpeg failed: {log.read().strip()}")
+
+        parts = [head_path]
+        if split:
+            # Seek half a frame past the keyframe so rounding can't land on
+            # the previous one and duplicate the re-encoded GOP
+            tail_path = os.path.join(tmp, 'tail.ts')
+            with timing.stage(timing.REMUX):
+                _run(['ffmpeg', '-v', 'error', '-y', '-ss', str(split[1] + 0.5 / fps),
+                      '-i', video_path, '-map', '0:v:0', '-c', 'copy', tail_path])
+            parts.append(tail_path)
+
+        concat(parts, output_path)
+
+    return head_frames
+
+
+def concat(parts, output_path):
+    """Join video files with identical stream settings into one, without re-encoding."""
+    with tempfile.TemporaryDirectory() as tmp:
+        list_path = os.path.join(tmp, 'parts.txt')
+        with open(list_path, 'w') as f:
+            f.writelines(f"file '{os.path.abspath(part)}'\n" for part in parts)
+        with timing.stage(timing.REMUX):
+            _run(['ffmpeg', '-v', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', list_path,
+                  '-map', '0:v:0', '-c', 'copy', output_path])
@@ -0,0 +1,352 @@
+"""Local job service: embed and extract over HTTP without a process per job.
+
+Jobs are the same dicts as batch manifest entries (see stego.cli). They wait
+in a bounded queue and run in a pool of worker processes that import the
+engines once at startup, so a job pays no Python or OpenCV start-up cost.
+
+    python -m stego serve --workers 4 --port 8765
+    python -m stego serve --socket /tmp/stego.sock
+
+    POST   /jobs              submit a job (JSON body); 202 with its id, 503 if the queue is full
+    GET    /jobs              every job's status
+    GET    /jobs/<id>         one job's status, with queue wait and run time
+    GET    /jobs/<id>/events  progress events as newline-delimited JSON until the job ends
+    DELETE /jobs/<id>         cancel a queued or running job
+    GET    /status            queue depth, running jobs and latency percentiles
+
+Job bodies must be sent as Content-Type: application/json, and requests
+carrying an Origin header are only accepted from a local origin, so a web
+page open in a browser can't submit jobs. The server-side `timings` and
+`frame_cache` job keys are ignored. For example:
+
+    curl -H 'Content-Type: application/json' \
+         -d '{"video": "in.mp4", "secret": "s.png", "output": "out.mp4"}' localhost:8765/jobs
+    curl -N localhost:8765/jobs/1/events
+"""
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from stego.pipeline import PipelineCancelled
+
+# Finished jobs kept for status queries and latency figures
+HISTORY = 1000
+
+# Job keys that name server-side paths; clients can't set them
+SERVER_KEYS = ('timings', 'frame_cache', 'cache_budget')
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+_REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found',
+            405: 'Method Not Allowed', 409: 'Conflict', 415: 'Unsupported Media Type',
+            503: 'Service Unavailable'}
+
+# Set in each worker process by _init_worker
+_events = None
+_cancelled = None
+
+
+def _init_worker(events, cancelled):
+    global _events, _cancelled
+    _events, _cancelled = events, cancelled
+    # Pay for the engine imports once per process, not once per job
+    import stego.dct  # noqa: F401
+    import stego.lsb  # noqa: F401
+
+
+def _execute(job_id, job, interval=0.1):
+    """Worker: run one job, sending throttled progress and stopping once it is cancelled."""
+    from stego.cli import run_job
+
+    last = [0.0]
+
+    def progress(value):
+        # Every engine reports progress per frame, so each call is a chance
+        # to stop; only the events sent back are throttled
+        if job_id in _cancelled:
+            raise PipelineCancelled("Operation cancelled")
+        now = time.monotonic()
+        if value < 100 and now - last[0] < interval:
+            return
+        last[0] = now
+        _events.put((job_id, value))
+
+    return run_job(job, progress)  # Writes the output only if the job succeeds
+
+
+class Job:
+    def __init__(self, job_id, spec):
+        self.id = job_id
+        self.spec = spec
+        self.state = 'queued'  # queued, running, ok, failed or cancelled
+        self.progress = 0.0
+        self.error = None
+        self.result = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = [{'event': 'queued'}]
+        self.changed = asyncio.Event()
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def emit(self, event):
+        self.events.append(event)
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def status(self):
+        wait = (self.started_at or self.finished_at or time.time()) - self.queued_at
+        run = (self.finished_at or time.time()) - self.started_at if self.started_at else None
+        return {'id': self.id, 'state': self.state, 'progress': round(self.progress, 1),
+                'error': self.error, 'mode': self.spec['mode'], 'method': self.spec['method'],
+                'output': self.spec.get('output'), 'wait_seconds': round(wait, 3),
+                'run_seconds': round(run, 3) if run is not None else None}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class JobService:
+    """Queue jobs and run up to `workers` of them at once in a process pool.
+
+    At most `max_queue` jobs wait at a time; further submissions are refused
+    until the queue drains. A job cancelled while it waits stops counting
+    at once and is dropped when it reaches the front of the queue.
+    """
+
+    def __init__(self, workers=None, max_queue=100):
+        self.workers = workers or os.cpu_count()
+        self.max_queue = max_queue
+        self.queue = asyncio.Queue()
+        self.waiting = 0  # Queued jobs that haven't been cancelled
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.running = 0
+        # Spawned, not forked: a forked worker would inherit open client
+        # connections and keep them from closing
+        context = multiprocessing.get_context('spawn')
+        self.manager = context.Manager()
+        self.events = self.manager.Queue()
+        self.cancelled = self.manager.dict()
+        self.pool = ProcessPoolExecutor(self.workers, context, initializer=_init_worker,
+                                        initargs=(self.events, self.cancelled))
+        self.loop = None
+        self.tasks = []
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.tasks = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        # Worker progress arrives on a manager queue; a thread hands it to the loop
+        threading.Thread(target=self._pump, name='service-progress', daemon=True).start()
+
+    def close(self):
+        for task in self.tasks:
+            task.cancel()
+        self.events.put(None)
+        self.pool.shutdown(cancel_futures=True)
+        self.manager.shutdown()
+
+    def submit(self, spec):
+        """Validate and queue a job spec; raises ValueError if it is invalid, asyncio.QueueFull if the queue is."""
+        from stego.cli import load_jobs
+
+        if isinstance(spec, dict):
+            spec = {key: value for key, value in spec.items() if key not in SERVER_KEYS}
+        spec = load_jobs([spec])[0]
+        if self.waiting >= self.max_queue:
+            raise asyncio.QueueFull
+        job = Job(next(self.ids), spec)
+        self.queue.put_nowait(job)
+        self.waiting += 1
+        self.jobs[job.id] = job
+        self._trim()
+        return job
+
+    def cancel(self, job):
+        if job.finished:
+            return False
+        if job.state == 'queued':
+            self.waiting -= 1
+            self._finish(job, 'cancelled')
+            return True
+        self.cancelled[job.id] = True
+        return True
+
+    def status(self):
+        finished = [job for job in self.jobs.values() if job.finished and job.started_at]
+        latency = {}
+        for name, values in (('wait_seconds', [job.started_at - job.queued_at for job in finished]),
+                             ('run_seconds', [job.finished_at - job.started_at for job in finished]),
+                             ('total_seconds', [job.finished_at - job.queued_at for job in finished])):
+            if values:
+                latency[name] = {'mean': round(sum(values) / len(values), 3),
+                                 'p50': round(_percentile(values, 0.5), 3),
+                                 'p95': round(_percentile(values, 0.95), 3),
+                                 'max': round(max(values), 3)}
+        states = [job.state for job in self.jobs.values()]
+        return {'workers': self.workers, 'queue_depth': states.count('queued'),
+                'running': self.running, 'queue_limit': self.max_queue,
+                'completed': {state: states.count(state) for state in ('ok', 'failed', 'cancelled')},
+                'latency': latency}
+
+    async def _dispatch(self):
+        while True:
+            job = await self.queue.get()
+            if job.finished:
+                continue  # Cancelled while it waited
+            self.waiting -= 1
+            job.state, job.started_at = 'running', time.time()
+            job.emit({'event': 'started'})
+            self.running += 1
+            try:
+                result = await self.loop.run_in_executor(self.pool, _execute, job.id, job.spec)
+            except Exception as e:
+                result = {'status': 'failed', 'error': str(e)}
+            finally:
+                self.running -= 1
+            self._finish(job, result['status'], result.get('error'), result)
+
+    def _finish(self, job, state, error=None, result=None):
+        job.state, job.error, job.result = state, error, result
+        job.finished_at = time.time()
+        if state == 'ok':
+            job.progress = 100.0
+        self.cancelled.pop(job.id, None)
+        event = {'event': state, 'seconds': round(job.finished_at - job.queued_at, 3)}
+        if error:
+            event['error'] = error
+        job.emit(event)
+
+    def _progress(self, job_id, value):
+        job = self.jobs.get(job_id)
+        if job is not None and not job.finished:
+            job.progress = value
+            job.emit({'event': 'progress', 'value': round(value, 1)})
+
+    def _pump(self):
+        while True:
+            item = self.events.get()
+            if item is None:
+                break
+            self.loop.call_soon_threadsafe(self._progress, *item)
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - HISTORY)]:
+            del self.jobs[job_id]
+
+    async def handle(self, reader, writer):
+        """Serve one HTTP request per connection."""
+        try:
+            request = await reader.readline()
+            method, path, _ = request.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length') or 0)
+            body = await reader.readexactly(length) if length else b''
+            if 'origin' in headers and not _local_origin(headers['origin']):
+                return await _respond(writer, 403, {'error': 'Cross-origin requests are not allowed'})
+            content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+            if method == 'POST' and content_type != 'application/json':
+                return await _respond(writer, 415, {'error': 'Expected Content-Type: application/json'})
+            await self._route(method, path.split('?')[0].rstrip('/'), body, writer)
+        except (ValueError, asyncio.IncompleteReadError):
+            await _respond(writer, 400, {'error': 'Malformed request'})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body, writer):
+        parts = path.strip('/').split('/')
+        if parts == ['status'] and method == 'GET':
+            return await _respond(writer, 200, self.status())
+        if parts == ['jobs'] and method == 'GET':
+            return await _respond(writer, 200, [job.status() for job in self.jobs.values()])
+        if parts == ['jobs'] and method == 'POST':
+            try:
+                job = self.submit(json.loads(body or b'{}'))
+            except (ValueError, TypeError, AttributeError) as e:
+                return await _respond(writer, 400, {'error': str(e)})
+            except asyncio.QueueFull:
+                return await _respond(writer, 503, {'error': 'Job queue is full'})
+            return await _respond(writer, 202, job.status())
+
+        job = self.jobs.get(int(parts[1])) if len(parts) in (2, 3) and parts[0] == 'jobs' and parts[1].isdigit() else None
+        if job is None:
+            return await _respond(writer, 404, {'error': 'No such job'})
+        if len(parts) == 3 and parts[2] == 'events' and method == 'GET':
+            return await self._stream(job, writer)
+        if len(parts) == 2 and method == 'GET':
+            return await _respond(writer, 200, job.status())
+        if len(parts) == 2 and method == 'DELETE':
+            if not self.cancel(job):
+                return await _respond(writer, 409, {'error': f'Job already {job.state}'})
+            return await _respond(writer, 202, job.status())
+        return await _respond(writer, 405, {'error': 'Method not allowed'})
+
+    async def _stream(self, job, writer):
+        writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n'
+                     b'Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n')
+        sent = 0
+        while True:
+            changed = job.changed
+            for event in job.events[sent:]:
+                data = json.dumps(dict(event, id=job.id)).encode() + b'\n'
+                writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+            sent = len(job.events)
+            await writer.drain()
+            if job.finished:
+                break
+            await changed.wait()
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+
+def _local_origin(origin):
+    """True for an Origin header naming this machine, e.g. http://localhost:3000."""
+    try:
+        return urlsplit(origin).hostname in LOCAL_HOSTS
+    except ValueError:
+        return False
+
+
+async def _respond(writer, code, data):
+    body = json.dumps(data, indent=2).encode() + b'\n'
+    writer.write(f'HTTP/1.1 {code} {_REASONS[code]}\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body)
+    await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8765, socket_path=None, workers=None, max_queue=100):
+    """Run the service until cancelled, on `socket_path` if given, otherwise on host:port."""
+    service = JobService(workers, max_queue)
+    await service.start()
+    if socket_path:
+        server = await asyncio.start_unix_server(service.handle, socket_path)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving on {socket_path or f'http://{host}:{port}'} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
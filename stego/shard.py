@@ -0,0 +1,179 @@
+"""Embed into long videos with one process per time segment.
+
+The video is cut at keyframes (from its frame index, see stego.frameindex)
+into one segment per worker. Each worker seeks straight to its segment,
+decodes it, applies the edits for the frames it owns and encodes it to its
+own file; the segment files are then joined with the ffmpeg concat demuxer,
+without re-encoding. Every segment is written with the same codec, size and
+frame rate. With a lossless codec the joined video decodes to exactly the
+frames a serial embed gives; a lossy encoder starts afresh at each segment,
+so its output differs slightly from a serial encode.
+
+Edits are plain data so they can be sent to the worker processes: a dict
+mapping frame index to a list of (operation, arguments) pairs, applied in
+order. The operations are listed in OPERATIONS.
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import cv2
+
+from stego import remux, timing
+from stego.codecs import CODECS, open_writer
+from stego.frameindex import load_index
+from stego.header import PayloadHeader, write_header
+from stego.kernels import LSBKernel
+from stego.pipeline import PipelineCancelled, PipelineStats
+from stego.video import FrameReader
+
+
+# stego.lsb and stego.dct import this module, so their helpers are imported
+# where they are used
+def _header(frame, packed):
+    return write_header(frame, PayloadHeader.unpack(packed))
+
+
+def _lsb_bits(frame, secret_bits, bits_per_channel):
+    height, width = secret_bits.shape[:2]
+    LSBKernel(bits_per_channel, secret_bits.shape).embed(frame[:height, :width], secret_bits)
+    return frame
+
+
+def _lsb_chunk(frame, chunk, bits_per_channel):
+    from stego.lsb import embed_chunk
+    return embed_chunk(frame, chunk, bits_per_channel)
+
+
+def _dct_row(frame, row, block_size):
+    from stego.dct import BlockDCT, embed_frame_blocks, embed_frame_full
+    if block_size:
+        return embed_frame_blocks(frame, row, BlockDCT(block_size))
+    return embed_frame_full(frame, row)
+
+
+def _dct_bits(frame, bits, block_size):
+    from stego.dct import BlockDCT, embed_frame_bits
+    return embed_frame_bits(frame, bits, BlockDCT(block_size))
+
+
+# Operation name -> function(frame, *arguments) returning the edited frame
+OPERATIONS = {
+    'header': _header,
+    'lsb-bits': _lsb_bits,
+    'lsb-chunk': _lsb_chunk,
+    'dct-row': _dct_row,
+    'dct-bits': _dct_bits,
+}
+
+
+def plan_segments(index, workers):
+    """Split the frames of `index` into at most `workers` (start, end) ranges starting on keyframes.
+
+    Each boundary is the keyframe nearest an even split point, so segments
+    come out as equal as the GOP structure allows.
+    """
+    starts = [0]
+    for part in range(1, workers):
+        target = index.frames * part // workers
+        candidates = [k for k in index.keyframes if starts[-1] < k < index.frames]
+        if not candidates:
+            break
+        starts.append(min(candidates, key=lambda k: abs(k - target)))
+    return list(zip(starts, starts[1:] + [index.frames]))
+
+
+# Set in each worker process by _init_worker; stops every running segment
+_stop = None
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def _embed_segment(video_path, index, segment_path, start, end, edits, codec, fps, frame_size):
+    """Worker: decode frames [start, end), apply `edits` and encode them to `segment_path`."""
+    reader = FrameReader(video_path, index=index)
+    out = None
+    try:
+        for frame_index in range(start, end):
+            if _stop is not None and _stop.is_set():
+                raise PipelineCancelled()
+            with timing.stage(timing.DECODE):
+                frame = reader.read(frame_index)
+            if frame is None:
+                raise Exception(f"Could not read frame {frame_index}")
+            if frame_size is not None and frame.shape[1::-1] != tuple(frame_size):
+                with timing.stage(timing.RESIZE):
+                    frame = cv2.resize(frame, frame_size)
+            if out is None:
+                out = open_writer(segment_path, codec, fps, frame.shape[1::-1])
+            with timing.stage(timing.BITS):
+                for operation, arguments in edits.get(frame_index, ()):
+                    frame = OPERATIONS[operation](frame, *arguments)
+            with timing.stage(timing.ENCODE):
+                out.write(frame)
+    finally:
+        reader.release()
+        if out is not None:
+            out.release()
+    return end - start
+
+
+def embed_sharded(video_path, output_path, edits, workers, codec='mp4v', fps=None,
+                  frame_size=None, progress_callback=None, cancel=None):
+    """Write `video_path` to `output_path` with `edits` applied, one process per segment.
+
+    `frame_size` resizes every frame, as the serial engines do. Needs
+    ffmpeg and ffprobe (see stego.remux.available). `progress_callback` is
+    called with a percentage as segments finish; setting `cancel` (a
+    threading.Event) drops the segments that haven't started, stops the
+    running ones at their next frame and raises PipelineCancelled. A failed
+    segment stops the others the same way. Returns a PipelineStats for the
+    whole video.
+    """
+    if not remux.available():
+        raise Exception("Sharded embedding needs ffmpeg and ffprobe")
+    index = load_index(video_path)
+    if index is None or index.frames == 0:
+        raise Exception("Could not index the video")
+    if fps is None:
+        with FrameReader(video_path) as reader:
+            fps = reader.fps
+    missing = [frame_index for frame_index in edits if not 0 <= frame_index < index.frames]
+    if missing:
+        raise Exception(f"The video has no frame {min(missing)}")
+
+    segments = plan_segments(index, workers)
+    start_time = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        extension = CODECS[codec][1]
+        paths = [os.path.join(tmp, f'segment{number:04d}{extension}') for number in range(len(segments))]
+        done = 0
+        stop = multiprocessing.Event()
+        with ProcessPoolExecutor(max_workers=min(workers, len(segments)), initializer=_init_worker,
+                                 initargs=(stop,)) as pool:
+            # Each worker only receives the edits for its own frames
+            pending = {pool.submit(_embed_segment, video_path, index, path, start, end,
+                                   {k: edits[k] for k in edits if start <= k < end},
+                                   codec, fps, frame_size)
+                       for path, (start, end) in zip(paths, segments)}
+            try:
+                while pending:
+                    finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        done += future.result()
+                    if finished and progress_callback:
+                        progress_callback(done / index.frames * 100)
+                    if cancel is not None and cancel.is_set():
+                        raise PipelineCancelled()
+            except BaseException:
+                # Running segments see `stop` and return; queued ones never start
+                stop.set()
+                pool.shutdown(cancel_futures=True)
+                raise
+        remux.concat(paths, output_path)
+    return PipelineStats(done, time.perf_counter() - start_time)
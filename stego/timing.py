@@ -0,0 +1,152 @@
+"""Opt-in per-stage timing for the embed and extract engines.
+
+The engines wrap each step in ``with timing.stage('decode'):`` and so on.
+Nothing is recorded unless a StageTimer is active, and then every stage's
+call count, cumulative time and per-call durations are collected:
+
+    with timing.instrument(report='job.json') as timer:
+        steg.embed_data(video, secret, output, progress_callback)
+    print(timer.summary())
+
+A `report` path ending in `.prom` is written in the Prometheus textfile
+format instead of JSON. While disabled, `stage()` hands back one shared
+no-op context manager, so the cost is a function call and a global lookup.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Stages the engines report
+DECODE = 'decode'
+RESIZE = 'resize'
+COLOR = 'color'
+DCT = 'dct'
+IDCT = 'idct'
+BITS = 'bits'
+POSTPROCESS = 'postprocess'
+ENCODE = 'encode'
+REMUX = 'remux'
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+_active = None
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimer:
+    """Thread-safe accumulator of stage durations.
+
+    `callback(name, seconds)` is called after every timed call, from the
+    thread that ran it. With `per_frame=False` only counts and totals are
+    kept, not each call's duration.
+    """
+
+    def __init__(self, callback=None, per_frame=True):
+        self.callback = callback
+        self.per_frame = per_frame
+        self.counts = {}
+        self.totals = {}
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+            if self.per_frame:
+                self.samples.setdefault(name, []).append(seconds)
+        if self.callback:
+            self.callback(name, seconds)
+
+    def summary(self):
+        """Per-stage count, total, mean and (with per_frame) p50/p95/max, in seconds."""
+        summary = {}
+        for name, count in self.counts.items():
+            entry = {'count': count, 'total': self.totals[name], 'mean': self.totals[name] / count}
+            samples = sorted(self.samples.get(name, ()))
+            if samples:
+                entry.update(p50=samples[len(samples) // 2],
+                             p95=samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                             max=samples[-1])
+            summary[name] = entry
+        return summary
+
+    def write_json(self, path):
+        report = {'stages': self.summary()}
+        if self.per_frame:
+            report['per_frame'] = self.samples
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    def write_prometheus(self, path, prefix='stego'):
+        """Write a node_exporter textfile; renamed into place so it is never read half-written."""
+        stages = sorted(self.summary().items())
+        lines = [f"# TYPE {prefix}_stage_seconds_total counter"]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {entry["total"]:.6f}'
+                  for name, entry in stages]
+        lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+        lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {entry["count"]}'
+                  for name, entry in stages]
+        with open(path + '.tmp', 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(path + '.tmp', path)
+
+    def write(self, path):
+        if path.endswith('.prom'):
+            self.write_prometheus(path)
+        else:
+            self.write_json(path)
+
+
+def stage(name):
+    """Context manager timing one step under `name` if a timer is active."""
+    timer = _active
+    if timer is None:
+        return _NULL_STAGE
+    return timer.stage(name)
+
+
+@contextmanager
+def instrument(callback=None, report=None, per_frame=True):
+    """Record stage timings of every engine call made inside the block.
+
+    The timer is process-wide, so stages run on pipeline threads are
+    included. `report` is written when the block exits, even on error.
+    """
+    global _active
+    timer = StageTimer(callback, per_frame)
+    previous, _active = _active, timer
+    try:
+        yield timer
+    finally:
+        _active = previous
+        if report:
+            timer.write(report)
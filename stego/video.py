@@ -0,0 +1,108 @@
+import cv2
+
+from stego.frameindex import load_index
+
+
+class FrameReader:
+    """Random access to the frames of a video file.
+
+    Instead of decoding every frame from the start, `read` seeks close to the
+    requested frame and only grabs (decodes without retrieving) the frames
+    left in between. Containers whose seeking can't be trusted fall back to a
+    sequential scan from the start of the file.
+
+    With `indexed`, the video's persistent frame index (see stego.frameindex)
+    supplies the keyframe before every requested frame, so a read seeks to a
+    position the decoder can start from and decodes at most one GOP. Readers
+    of the same video can share one FrameIndex by passing it as `index`.
+    """
+
+    def __init__(self, video_path, max_gap=30, indexed=False, index=None):
+        self.video_path = video_path
+        self.max_gap = max_gap  # Grab forward rather than seek for short jumps
+        self.seekable = True
+        self.index = index or (load_index(video_path) if indexed else None)
+        self._open()
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = self.index.frames if self.index else int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.video_path)
+        self.position = 0  # Index of the frame the next grab/read returns
+
+    def _seek(self, index):
+        if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, index):
+            return False
+        if int(self.cap.get(cv2.CAP_PROP_POS_FRAMES)) != index:
+            return False
+
+        # Some containers accept the seek and report the new position but
+        # land somewhere else; the decoded timestamp is an independent check
+        if self.index is not None and index >= 1:
+            if not self._landed_after(index - 1):
+                return False
+        elif self.fps > 0 and index > 1:
+            period = 1000.0 / self.fps
+            if abs(self.cap.get(cv2.CAP_PROP_POS_MSEC) - index * period) > 2 * period:
+                return False
+
+        self.position = index
+        return True
+
+    def _landed_after(self, frame):
+        """Whether the last decoded frame is `frame`, going by the indexed timestamps."""
+        pts = self.index.pts
+        if frame >= len(pts):
+            return False
+        # Exact on variable frame rate video too: the reported timestamp has
+        # to be nearer this frame's than either neighbour's
+        position = pts[0] + self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        nearest = min(range(max(frame - 1, 0), min(frame + 2, len(pts))),
+                      key=lambda k: abs(pts[k] - position))
+        return nearest == frame
+
+    def read(self, index, keyframe=None):
+        """Return frame `index` as a BGR array, or None if it can't be read.
+
+        `keyframe` is an optional known keyframe at or before `index` to seek
+        to; without it the backend is asked to land on `index` directly.
+        """
+        if index < 0:
+            return None
+        if keyframe is None and self.index is not None:
+            keyframe = self.index.keyframe_before(index)
+
+        # Already inside the right GOP: decoding forward beats seeking back
+        gap = index - self.position
+        in_gop = keyframe is not None and keyframe <= self.position <= index
+        if self.seekable and not 0 <= gap <= self.max_gap and not in_gop:
+            target = index if keyframe is None or keyframe > index else keyframe
+            if not self._seek(target):
+                # Don't trust this file again; scan from the start instead
+                self.seekable = False
+                self.cap.release()
+                self._open()
+
+        if index < self.position:
+            self.cap.release()
+            self._open()
+
+        while self.position < index:
+            if not self.cap.grab():
+                return None
+            self.position += 1
+
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self.position += 1
+        return frame
+
+    def release(self):
+        self.cap.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# Make the stego package and the root scripts importable from the tests
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    # Only the tests of the headless modules run without OpenCV and NumPy
+    collect_ignore = [name for name in os.listdir(os.path.dirname(__file__))
+                      if name.startswith('test_') and name not in ('test_cli.py', 'test_imports.py')]
+
+FRAME_SHAPE = (480, 640, 3)
+
+
+@pytest.fixture
+def frame():
+    """A random 640x480 BGR frame."""
+    return np.random.default_rng(0).integers(0, 256, FRAME_SHAPE, dtype=np.uint8)
+
+
+@pytest.fixture
+def secret():
+    """Another random 640x480 BGR frame, to hide in `frame`."""
+    return np.random.default_rng(1).integers(0, 256, FRAME_SHAPE, dtype=np.uint8)
+
+
+@pytest.fixture
+def make_video(tmp_path):
+    """Factory writing a smooth, slowly moving FFV1 cover video; returns its path."""
+    def make(frames=10, size=(320, 240), name='cover.mkv'):
+        width, height = size
+        noise = np.random.default_rng(2).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        base = cv2.GaussianBlur(noise, (31, 31), 0)
+        path = str(tmp_path / name)
+        out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'FFV1'), 25, size)
+        for index in range(frames):
+            out.write(np.roll(base, index, axis=1))
+        out.release()
+        return path
+    return make
+
+
+@pytest.fixture
+def secret_png(tmp_path, secret):
+    """`secret` saved as a PNG; returns its path."""
+    path = str(tmp_path / 'secret.png')
+    cv2.imwrite(path, secret)
+    return path
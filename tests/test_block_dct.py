@@ -0,0 +1,20 @@
+import cv2
+import numpy as np
+
+from stego.dct import BlockDCT, embed_frame_blocks, extract_frame_blocks
+
+
+def test_forward_matches_cv2_dct():
+    blocks = np.random.default_rng(0).random((64, 8, 8), dtype=np.float32)
+    expected = np.stack([cv2.dct(block) for block in blocks])
+    assert np.allclose(BlockDCT(8).forward(blocks), expected, atol=1e-4)
+
+
+def test_extract_recovers_embedded_row(frame, secret):
+    smooth = cv2.GaussianBlur(frame, (31, 31), 0)
+    row = secret[0, :64]
+    transform = BlockDCT(8)
+
+    extracted = extract_frame_blocks(embed_frame_blocks(smooth, row, transform), len(row), transform)
+    assert extracted.shape == row.shape
+    assert np.abs(extracted.astype(int) - row).mean() < 8
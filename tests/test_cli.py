@@ -0,0 +1,21 @@
+import pytest
+
+from stego.cli import load_jobs
+
+
+def test_load_jobs_fills_defaults():
+    job, = load_jobs([{'video': 'in.mp4', 'secret': 's.png', 'output': 'out.mp4', 'method': ' DCT '}])
+    assert (job['mode'], job['method']) == ('embed', 'dct')
+
+
+@pytest.mark.parametrize('job, message', [
+    ({'mode': 1, 'video': 'in.mp4', 'output': 'out.png'}, 'Job 1: mode must be a string'),
+    ({'method': ['lsb'], 'video': 'in.mp4', 'secret': 's.png', 'output': 'o.mp4'},
+     'Job 1: method must be a string'),
+    ({'mode': 'peek', 'video': 'in.mp4', 'output': 'out.png'}, "Job 1: unknown mode 'peek'"),
+    ({'video': 'in.mp4', 'output': 'out.mp4'}, 'Job 1: missing secret'),
+    ('in.mp4', 'Job 1: expected an object'),
+])
+def test_load_jobs_rejects_bad_jobs(job, message):
+    with pytest.raises(ValueError, match=message):
+        load_jobs([job])
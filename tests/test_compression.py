@@ -0,0 +1,77 @@
+import cv2
+import numpy as np
+import pytest
+
+from stego import dct
+from stego.compression import available, compress, decompress, method_of
+from stego.header import read_header
+from stego.kernels import replicate_lut
+from stego.lsb import Steganography
+
+TEXT = b'The quick brown fox jumps over the lazy dog. ' * 2000
+METHODS = available()
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_compress_round_trip(method):
+    packed, flag = compress(TEXT, method)
+    assert len(packed) < len(TEXT)
+    assert method_of(flag) == method
+    assert decompress(packed, flag) == TEXT
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_incompressible_data_passes_through(method):
+    data = np.random.default_rng(5).integers(0, 256, 4096, dtype=np.uint8).tobytes()
+    assert compress(data, method) == (data, 0)
+    assert decompress(data, 0) == data
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match='Unknown compression method'):
+        compress(TEXT, 'brotli')
+
+
+def compressing_steganography(method, bits=1):
+    steg = Steganography(bits_per_channel=bits, frame_size=(320, 240))
+    steg.use_header = True
+    steg.codec = 'ffv1'
+    steg.compression = method
+    return steg
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_lsb_bytes_round_trip(make_video, tmp_path, method):
+    steg = compressing_steganography(method)
+    output = str(tmp_path / 'stego.mkv')
+    steg.embed_bytes(make_video(3), TEXT, output)
+
+    header = read_header(cv2.VideoCapture(output).read()[1])
+    assert method_of(header.flags) == method
+    assert header.payload_length < len(TEXT)
+    assert steg.extract_bytes(output) == TEXT
+    assert steg.last_checksum_ok
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_lsb_image_round_trip(make_video, tmp_path, method):
+    # A flat image compresses well and keeps its shape through the bytes
+    secret = np.zeros((120, 160, 3), dtype=np.uint8)
+    secret[:, 80:] = (200, 100, 50)
+    secret_path, extracted = str(tmp_path / 'secret.png'), str(tmp_path / 'out.png')
+    cv2.imwrite(secret_path, secret)
+    steg = compressing_steganography(method, bits=4)
+    output = str(tmp_path / 'stego.mkv')
+    steg.embed_data(make_video(3), secret_path, output, lambda value: None)
+    assert method_of(read_header(cv2.VideoCapture(output).read()[1]).flags) == method
+
+    steg.extract_data(output, extracted, lambda value: None)
+    assert steg.last_checksum_ok
+    assert (cv2.imread(extracted) == replicate_lut(4)[secret >> 4]).all()
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_dct_bytes_round_trip(make_video, tmp_path, method):
+    output = str(tmp_path / 'stego.mkv')
+    dct.embed_bytes(make_video(3), TEXT, output, compression=method)
+    assert dct.extract_bytes(output) == (TEXT, True)
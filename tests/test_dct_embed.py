@@ -0,0 +1,15 @@
+import numpy as np
+
+from stego.dct import coefficient_mask, embed_frame_full
+from tests.reference import embed_frame_full_loop
+
+
+def test_matches_per_pixel_loop(frame, secret):
+    for row in secret[:8, :64]:
+        assert np.array_equal(embed_frame_full(frame, row), embed_frame_full_loop(frame, row))
+
+
+def test_coefficient_mask_matches_per_pixel_loop(frame, secret):
+    mask = coefficient_mask(frame.shape[:2], 64)
+    for row in secret[:8, :64]:
+        assert np.array_equal(embed_frame_full(frame, row, mask), embed_frame_full_loop(frame, row))
@@ -0,0 +1,31 @@
+import cv2
+import numpy as np
+import pytest
+
+from stego.dct import embed_video, extract_video
+from stego.header import read_header
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.mark.parametrize('frames', [40, 70])
+@pytest.mark.parametrize('block_size', [None, 8])
+def test_header_round_trip(make_video, secret_png, tmp_path, frames, block_size):
+    output, extracted = str(tmp_path / 'stego.mkv'), str(tmp_path / 'out.png')
+    embed_video(make_video(frames), secret_png, output, block_size=block_size, codec='ffv1', header=True)
+
+    header = read_header(cv2.VideoCapture(output).read()[1])
+    assert header.frame_count == min(64, frames - 1)
+    assert extract_video(output, extracted)
+    if block_size:
+        # One row per carrier frame; rows the video had no frame for stay black
+        image = np.array(Image.open(extracted), dtype=int)
+        expected = np.array(Image.open(secret_png).convert('RGB').resize((64, 64)), dtype=int)
+        rows = header.frame_count
+        assert np.abs(image[:rows] - expected[:rows]).mean() < 12
+        assert not image[rows:].any()
+
+
+def test_header_needs_a_lossless_codec(make_video, secret_png, tmp_path):
+    with pytest.raises(Exception, match='lossless'):
+        embed_video(make_video(5), secret_png, str(tmp_path / 'stego.mp4'), header=True)
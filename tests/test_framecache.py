@@ -0,0 +1,75 @@
+import os
+
+import cv2
+import numpy as np
+
+from stego.framecache import FrameCache
+from stego.lsb import Steganography
+
+
+def read_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            return frames
+        frames.append(frame)
+
+
+def test_cached_embed_matches_the_decoded_one(make_video, secret_png, tmp_path):
+    cover = make_video(6)
+    cache = FrameCache(str(tmp_path / 'cache'))
+    outputs = []
+    for run in range(3):
+        # The first run decodes and fills the cache, the others map it
+        steg = Steganography(bits_per_channel=2 + run * 2)
+        steg.codec = 'ffv1'
+        steg.frame_cache = cache
+        outputs.append(str(tmp_path / f'stego{run}.mkv'))
+        steg.embed_data(cover, secret_png, outputs[-1], lambda value: None)
+        assert cache.open(cover, steg.frame_size) is not None
+
+    steg = Steganography(bits_per_channel=6)
+    steg.codec = 'ffv1'
+    steg.embed_data(cover, secret_png, str(tmp_path / 'plain.mkv'), lambda value: None)
+    plain, cached = read_frames(str(tmp_path / 'plain.mkv')), read_frames(outputs[-1])
+    assert len(plain) == len(cached) == 6
+    assert all(np.array_equal(a, b) for a, b in zip(plain, cached))
+
+
+def test_aborted_writer_leaves_no_entry(make_video, tmp_path):
+    cover = make_video(2)
+    cache = FrameCache(str(tmp_path / 'cache'))
+    writer = cache.writer(cover, (320, 240), 2)
+    writer.write(np.zeros((240, 320, 3), dtype=np.uint8))
+    writer.abort()
+    assert cache.open(cover, (320, 240)) is None
+    assert os.listdir(cache.directory) == []
+
+
+def test_evicted_entry_reads_as_uncached(make_video, tmp_path):
+    cover = make_video(2)
+    cache = FrameCache(str(tmp_path / 'cache'))
+    writer = cache.writer(cover, (320, 240), 2)
+    for _ in range(2):
+        writer.write(np.zeros((240, 320, 3), dtype=np.uint8))
+    writer.commit()
+    assert cache.open(cover, (320, 240)).shape == (2, 240, 320, 3)
+
+    # Another process evicted the frames between the two files
+    os.unlink(os.path.join(cache.directory, cache.key(cover, (320, 240)) + '.raw'))
+    assert cache.open(cover, (320, 240)) is None
+
+
+def test_budget_evicts_the_least_recently_used(make_video, tmp_path):
+    first, second = make_video(1, name='first.mkv'), make_video(1, name='second.mkv')
+    entry = 240 * 320 * 3
+    cache = FrameCache(str(tmp_path / 'cache'), budget=entry)
+    for cover in (first, second):
+        writer = cache.writer(cover, (320, 240), 1)
+        writer.write(np.zeros((240, 320, 3), dtype=np.uint8))
+        writer.commit()
+    assert cache.open(first, (320, 240)) is None
+    assert cache.open(second, (320, 240)) is not None
+    assert cache.writer(first, (640, 480), 1) is None  # Larger than the whole budget
@@ -0,0 +1,93 @@
+import os
+import shutil
+import subprocess
+
+import cv2
+import numpy as np
+import pytest
+
+from stego import frameindex, remux
+from stego.frameindex import FrameIndex, load_index
+from stego.video import FrameReader
+
+
+@pytest.fixture(autouse=True)
+def index_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('STEGO_INDEX_CACHE', str(tmp_path / 'index'))
+
+
+def decode_all(path):
+    """Every frame of `path` and its timestamp in seconds, decoded in order."""
+    cap = cv2.VideoCapture(path)
+    frames, pts = [], []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            return frames, pts
+        frames.append(frame)
+        pts.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+
+
+def test_save_and_load(make_video, tmp_path):
+    video = make_video(3)
+    path = str(tmp_path / 'cover.stgidx')
+    index = FrameIndex(3, [0], [0.0, 0.04, 0.08], frameindex._fingerprint(video))
+    index.save(path)
+    loaded = FrameIndex.load(path)
+    assert (loaded.frames, loaded.keyframes, loaded.pts, loaded.fingerprint) == \
+        (3, [0], [0.0, 0.04, 0.08], index.fingerprint)
+    assert loaded.keyframe_before(2) == 0
+
+
+def test_older_versions_are_rejected(tmp_path):
+    path = str(tmp_path / 'old.stgidx')
+    FrameIndex(1, [0], [0.0]).save(path)
+    with open(path) as f:
+        data = f.read().replace(f'"version": {frameindex.VERSION}', '"version": 2')
+    with open(path, 'w') as f:
+        f.write(data)
+    with pytest.raises(ValueError, match='version 2'):
+        FrameIndex.load(path)
+
+
+def test_stale_index_is_not_reused(make_video):
+    video = make_video(3)
+    index = FrameIndex(3, [0], [0.0, 0.04, 0.08], frameindex._fingerprint(video))
+    path = frameindex._cache_path(video)
+    os.makedirs(os.path.dirname(path))
+    index.save(path)
+    assert load_index(video, build=False).frames == 3
+
+    # Touching the file changes its fingerprint
+    os.utime(video, ns=(0, 0))
+    assert load_index(video, build=False) is None
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="needs ffmpeg")
+def test_seeks_on_variable_frame_rate_video(tmp_path):
+    # 25 fps for two seconds, then 10 fps: OpenCV's frame-number seeks land
+    # one frame early in the second half
+    video = str(tmp_path / 'vfr.mkv')
+    subprocess.run(['ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=25',
+                    '-t', '4', '-vf', "setpts='if(lt(N,50),N*0.04/TB,(2+(N-50)*0.1)/TB)'",
+                    '-fps_mode', 'vfr', '-c:v', 'ffv1', '-g', '10', video], check=True)
+    frames, pts = decode_all(video)
+    index = FrameIndex(len(frames), list(range(0, len(frames), 10)), pts)
+
+    for k in (5, 30, 50, 55, 60, len(frames) - 1):
+        with FrameReader(video, max_gap=0, index=index) as reader:
+            assert np.array_equal(reader.read(k), frames[k]), k
+
+
+@pytest.mark.skipif(not remux.available(), reason="needs ffmpeg and ffprobe")
+def test_indexed_reads_match_plain_reads(make_video):
+    video = make_video(60)
+    frames, _ = decode_all(video)
+    index = load_index(video)
+    assert index.frames == len(frames) == len(index.pts)
+    assert load_index(video, build=False) is not None
+
+    targets = np.random.default_rng(0).integers(0, index.frames, 20).tolist()
+    with FrameReader(video, indexed=True) as reader:
+        for k in targets:
+            assert np.array_equal(reader.read(k), frames[k]), k
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from stego.header import (FLAG_BYTES, FLAG_SHUFFLED, HEADER_BITS, HEADER_SIZE, METHOD_LSB,
+                          PayloadHeader, read_header, write_header)
+
+
+def make_header():
+    return PayloadHeader(METHOD_LSB, 2, 48, 64, 3, payload_length=1234, seed=99,
+                         first_frame=1, frame_count=7, span=20,
+                         flags=FLAG_SHUFFLED | FLAG_BYTES, payload_crc=0xDEADBEEF)
+
+
+def fields(header):
+    return (header.method, header.bits_per_channel, header.height, header.width,
+            header.channels, header.payload_length, header.seed, header.first_frame,
+            header.frame_count, header.span, header.flags, header.payload_crc)
+
+
+def test_pack_unpack_round_trip():
+    header = make_header()
+    data = header.pack()
+    assert len(data) == HEADER_SIZE
+    assert fields(PayloadHeader.unpack(data)) == fields(header)
+
+
+def test_unpack_rejects_a_corrupted_header():
+    data = bytearray(make_header().pack())
+    data[10] ^= 0x01
+    with pytest.raises(ValueError, match="corrupt"):
+        PayloadHeader.unpack(data)
+
+
+def test_unpack_rejects_missing_magic_and_short_data():
+    data = make_header().pack()
+    with pytest.raises(ValueError):
+        PayloadHeader.unpack(b'XXXX' + data[4:])
+    with pytest.raises(ValueError):
+        PayloadHeader.unpack(data[:-1])
+
+
+def test_read_header_round_trip(frame):
+    header = make_header()
+    write_header(frame, header)
+    assert fields(read_header(frame)) == fields(header)
+
+
+def test_read_header_rejects_a_flipped_bit(frame):
+    write_header(frame, make_header())
+    frame.reshape(-1)[40] ^= 1
+    assert read_header(frame) is None
+
+
+def test_read_header_on_legacy_frames(frame):
+    # Frames from before the header existed hold noise in their low bits
+    assert read_header(frame) is None
+    assert read_header(np.zeros((4, 4, 3), dtype=np.uint8)) is None
+    assert read_header(np.zeros(HEADER_BITS - 1, dtype=np.uint8)) is None
@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a headless caller imports, and what they must never pull in
+HEADLESS = {
+    'stego.cli': ('tkinter', 'cv2', 'numpy', 'PIL'),
+    'stego.service': ('tkinter', 'cv2', 'numpy', 'PIL'),
+    'stego.lsb': ('tkinter', 'PIL', 'scipy'),
+    'stego.dct': ('tkinter', 'PIL', 'scipy'),
+}
+
+
+def loaded_modules(statement):
+    """Run `statement` in a fresh interpreter and return the modules it left imported."""
+    code = f'{statement}; import json, sys; print(json.dumps(sorted(sys.modules)))'
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+@pytest.mark.parametrize('module', sorted(HEADLESS))
+def test_headless_imports(module):
+    if module in ('stego.lsb', 'stego.dct'):
+        pytest.importorskip('cv2')
+    loaded = loaded_modules(f'import {module}')
+    assert not loaded & set(HEADLESS[module])
+
+
+@pytest.mark.parametrize('script', ['embed3', 'extract_6'])
+def test_gui_scripts_import_without_a_window(script):
+    pytest.importorskip('tkinter')
+    pytest.importorskip('PIL')
+    pytest.importorskip('cv2')
+    loaded = loaded_modules(f'import tkinter, {script}; assert tkinter._default_root is None')
+    assert 'scipy' not in loaded
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from stego.jobs import BackgroundJob, staged_output
+from stego.pipeline import PipelineCancelled
+
+
+def run(job):
+    job.start().thread.join()
+    events = []
+    job.dispatch(lambda value: None, lambda value: events.append('done'),
+                 lambda error: events.append('error'), lambda: events.append('cancelled'))
+    return events
+
+
+@pytest.fixture
+def existing(tmp_path):
+    path = tmp_path / 'out.png'
+    path.write_bytes(b'original')
+    return path
+
+
+def test_failed_job_keeps_the_existing_output(existing):
+    def target(progress_callback, cancel, output):
+        with open(output, 'wb') as f:
+            f.write(b'partial')
+        raise Exception('boom')
+
+    assert run(BackgroundJob(target, str(existing))) == ['error']
+    assert existing.read_bytes() == b'original'
+    assert os.listdir(existing.parent) == ['out.png']
+
+
+def test_cancelled_job_leaves_nothing_behind(tmp_path):
+    def target(progress_callback, cancel, output):
+        with open(output, 'wb') as f:
+            f.write(b'partial')
+        raise PipelineCancelled()
+
+    assert run(BackgroundJob(target, str(tmp_path / 'out.png'))) == ['cancelled']
+    assert os.listdir(tmp_path) == []
+
+
+def test_successful_job_replaces_the_output(existing):
+    def target(progress_callback, cancel, output):
+        assert output.endswith('.png') and output != str(existing)
+        with open(output, 'wb') as f:
+            f.write(b'new')
+
+    assert run(BackgroundJob(target, str(existing))) == ['done']
+    assert existing.read_bytes() == b'new'
+    assert os.listdir(existing.parent) == ['out.png']
+
+
+def test_staged_output_removes_the_temporary_file_on_error(tmp_path):
+    with pytest.raises(ValueError):
+        with staged_output(str(tmp_path / 'video.mkv')) as path:
+            assert os.path.exists(path)
+            raise ValueError()
+    assert os.listdir(tmp_path) == []
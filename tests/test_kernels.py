@@ -0,0 +1,45 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from stego.kernels import FrameRing, LSBKernel
+from tests.reference import embed_lsb_loop, extract_lsb_loop
+
+SHAPE = (480, 640, 3)
+
+
+@pytest.mark.parametrize('bits', [1, 2, 3, 4, 5, 6, 8])
+def test_matches_per_channel_loops(frame, secret, bits):
+    kernel = LSBKernel(bits, SHAPE)
+    embedded = kernel.embed(frame.copy(), kernel.secret_bits(secret))
+    assert np.array_equal(embedded, embed_lsb_loop(frame.copy(), secret, bits))
+    assert np.array_equal(kernel.extract(embedded), extract_lsb_loop(embedded, bits))
+
+
+def test_extract_into_a_view(frame):
+    kernel = LSBKernel(6, (100, 200, 3))
+    out = np.zeros(SHAPE, dtype=np.uint8)
+    kernel.extract(frame[:100, :200], out=out[:100, :200])
+    assert np.array_equal(out[:100, :200], extract_lsb_loop(frame[:100, :200].copy(), 6))
+    assert not out[100:].any()
+
+
+def test_steady_state_allocates_nothing_per_frame(frame, secret):
+    # 100 frames through the ring and kernel should allocate nothing that
+    # scales with the frame size
+    kernel = LSBKernel(6, SHAPE)
+    secret_bits = kernel.secret_bits(secret)
+    ring = FrameRing(SHAPE, 4)
+    extracted = np.empty(SHAPE, dtype=np.uint8)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(100):
+            buffer = ring.next()
+            np.copyto(buffer, frame)
+            kernel.extract(kernel.embed(buffer, secret_bits), out=extracted)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak - before < frame.nbytes // 10
@@ -0,0 +1,73 @@
+import cv2
+import pytest
+
+from stego.header import FLAG_SHUFFLED, read_header
+from stego.kernels import replicate_lut
+from stego.lsb import Steganography
+
+
+def header_steganography(shuffle_seed=None):
+    steg = Steganography(frame_size=(320, 240))
+    steg.use_header = True
+    steg.codec = 'ffv1'
+    steg.shuffle_seed = shuffle_seed
+    return steg
+
+
+@pytest.mark.parametrize('shuffle_seed', [None, 7])
+def test_multi_frame_round_trip(make_video, secret_png, secret, tmp_path, shuffle_seed):
+    # A 640x480 secret needs four 320x240 carrier frames
+    steg = header_steganography(shuffle_seed)
+    output, extracted = str(tmp_path / 'stego.mkv'), str(tmp_path / 'out.png')
+    steg.embed_data(make_video(12), secret_png, output, lambda value: None)
+
+    header = read_header(cv2.VideoCapture(output).read()[1])
+    assert header.frame_count == 4
+    assert bool(header.flags & FLAG_SHUFFLED) == (shuffle_seed is not None)
+
+    steg.extract_data(output, extracted, lambda value: None)
+    assert steg.last_checksum_ok
+    bits = steg.bits_per_channel
+    assert (cv2.imread(extracted) == replicate_lut(bits)[secret >> (8 - bits)]).all()
+
+
+def test_multi_frame_needs_enough_frames(make_video, secret_png, tmp_path):
+    with pytest.raises(Exception, match='4 carrier frames'):
+        header_steganography().embed_data(make_video(4), secret_png, str(tmp_path / 'stego.mkv'),
+                                          lambda value: None)
+
+
+def test_single_frame_round_trip(make_video, secret_png, secret, tmp_path):
+    # No header: the secret is resized to the frame and read back with LSBKernel
+    steg = Steganography()
+    steg.codec = 'ffv1'
+    output, extracted = str(tmp_path / 'stego.mkv'), str(tmp_path / 'out.png')
+    steg.embed_data(make_video(3), secret_png, output, lambda value: None)
+    steg.extract_data(output, extracted, lambda value: None)
+
+    bits = steg.bits_per_channel
+    assert (cv2.imread(extracted) == replicate_lut(bits)[secret >> (8 - bits)]).all()
+
+
+def test_native_round_trip(make_video, secret, tmp_path):
+    # With no frame size the secret keeps its own size in the top-left corner
+    path = str(tmp_path / 'small.png')
+    cv2.imwrite(path, secret[:150, :200])
+    steg = Steganography(frame_size=None)
+    steg.codec = 'ffv1'
+    output, extracted = str(tmp_path / 'stego.mkv'), str(tmp_path / 'out.png')
+    steg.embed_data(make_video(3), path, output, lambda value: None)
+    assert cv2.VideoCapture(output).read()[1].shape == (240, 320, 3)
+
+    steg.extract_data(output, extracted, lambda value: None)
+    bits = steg.bits_per_channel
+    assert (cv2.imread(extracted) == replicate_lut(bits)[secret[:150, :200] >> (8 - bits)]).all()
+
+
+def test_native_fits_a_larger_secret(make_video, secret_png, tmp_path):
+    steg = Steganography(frame_size=None)
+    steg.codec = 'ffv1'
+    output, extracted = str(tmp_path / 'stego.mkv'), str(tmp_path / 'out.png')
+    steg.embed_data(make_video(3), secret_png, output, lambda value: None)
+    steg.extract_data(output, extracted, lambda value: None)
+    assert cv2.imread(extracted).shape == (240, 320, 3)
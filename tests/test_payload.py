@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from stego import dct
+from stego.lsb import Steganography
+from stego.payload import bytes_to_symbols, symbol_count, symbols_to_bytes
+
+DATA = np.random.default_rng(4).integers(0, 256, 1001, dtype=np.uint8).tobytes()
+
+
+@pytest.mark.parametrize('bits', range(1, 9))
+def test_symbols_round_trip(bits):
+    symbols = bytes_to_symbols(DATA, bits)
+    assert len(symbols) == symbol_count(len(DATA), bits)
+    assert symbols.max() < 2 ** bits
+    assert symbols_to_bytes(symbols, bits, len(DATA)) == DATA
+
+
+def test_symbols_are_most_significant_first():
+    assert list(bytes_to_symbols(b'\xb4', 3)) == [0b101, 0b101, 0b000]
+    assert symbols_to_bytes([0b101, 0b101, 0b000], 3, 1) == b'\xb4'
+
+
+@pytest.mark.parametrize('bits', [1, 4, 8])
+def test_lsb_bytes_round_trip(make_video, tmp_path, bits):
+    steg = Steganography(bits_per_channel=bits)
+    steg.codec = 'ffv1'
+    output = str(tmp_path / 'stego.mkv')
+    # 200 KB spans several 640x480 frames at one bit per channel
+    data = DATA * 200
+    steg.embed_bytes(make_video(5), data, output)
+    assert steg.extract_bytes(output) == data
+    assert steg.last_checksum_ok
+
+
+def test_dct_bytes_round_trip(make_video, tmp_path):
+    output = str(tmp_path / 'stego.mkv')
+    dct.embed_bytes(make_video(5), DATA, output)
+    assert dct.extract_bytes(output) == (DATA, True)
@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+import pytest
+
+from stego.permutation import KeyedPermutation, fisher_yates_shuffle, legacy_permutation, permutation
+from tests.reference import fisher_yates_shuffle_global
+
+# Sizes just past a power of four make most Feistel outputs fall outside
+# range(n), so lookups have to cycle-walk
+SIZES = [1, 2, 5, 17, 100, 257, 1025]
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_keyed_permutation_is_a_bijection(n):
+    perm = KeyedPermutation(n, seed=7)
+    assert sorted(perm) == list(range(n))
+
+
+@pytest.mark.parametrize('n', SIZES)
+def test_inverse_and_take_agree_with_lookup(n):
+    perm = KeyedPermutation(n, seed=7)
+    values = [perm[k] for k in range(n)]
+    assert [perm.inverse(value) for value in values] == list(range(n))
+    assert perm.take(np.arange(n)).tolist() == values
+
+
+def test_keyed_permutation_depends_on_the_seed():
+    assert list(KeyedPermutation(100, seed=1)) == list(KeyedPermutation(100, seed=1))
+    assert list(KeyedPermutation(100, seed=1)) != list(KeyedPermutation(100, seed=2))
+
+
+def test_keyed_permutation_rejects_out_of_range():
+    perm = KeyedPermutation(10, seed=0)
+    with pytest.raises(IndexError):
+        perm[10]
+    with pytest.raises(IndexError):
+        perm.inverse(-1)
+    with pytest.raises(IndexError):
+        perm.take([3, 10])
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 64, 1000])
+def test_legacy_order_matches_the_original_shuffle(n):
+    state = random.getstate()
+    try:
+        expected = fisher_yates_shuffle_global(list(range(n)), 42)
+    finally:
+        random.setstate(state)
+    assert legacy_permutation(n) == expected
+
+
+def test_legacy_order_is_pinned():
+    # Videos embedded so far were shuffled this way; it must never change
+    assert legacy_permutation(10) == [7, 3, 2, 8, 5, 6, 9, 4, 0, 1]
+
+
+def test_legacy_shuffle_leaves_the_global_generator_alone():
+    random.seed(123)
+    expected = random.random()
+    random.seed(123)
+    fisher_yates_shuffle(list(range(50)), 42)
+    assert random.random() == expected
+
+
+def test_numpy_permutation_is_a_permutation():
+    assert sorted(permutation(500, 3).tolist()) == list(range(500))
@@ -0,0 +1,86 @@
+import math
+
+import numpy as np
+import pytest
+
+from stego import dct
+from stego.quality import analyze, bit_errors, psnr_batch, ssim_batch, summarize
+
+
+def batch(shape=(2, 48, 64, 3), seed=0):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+def test_identical_frames():
+    frames = batch()
+    assert np.isinf(psnr_batch(frames, frames)).all()
+    assert ssim_batch(frames, frames) == pytest.approx([1.0, 1.0])
+
+
+def test_psnr_of_a_known_error():
+    cover = np.full((1, 8, 8, 3), 100, dtype=np.uint8)
+    stego = cover + np.uint8(1)
+    # MSE 1 everywhere
+    assert psnr_batch(cover, stego)[0] == pytest.approx(20 * math.log10(255))
+
+
+def test_ssim_drops_with_noise():
+    cover = batch()
+    noisy = np.clip(cover + batch(seed=1) // 8, 0, 255).astype(np.uint8)
+    ssim = ssim_batch(cover, noisy)
+    assert ((ssim < 1.0) & (ssim > -1.0)).all()
+
+
+@pytest.mark.parametrize('size', [1, 3, 6])
+def test_ssim_on_frames_smaller_than_the_window(size):
+    frames = batch((2, size, size, 3))
+    ssim = ssim_batch(frames, frames)
+    assert ssim.shape == (2,)
+    assert ssim == pytest.approx([1.0, 1.0])
+
+
+@pytest.mark.parametrize('bits', [1, 2, 6])
+def test_bit_errors(bits):
+    rng = np.random.default_rng(3)
+    expected = rng.integers(0, 2 ** bits, 500, dtype=np.uint8)
+    frame = batch((1, 10, 20, 3))[0]
+    flat = frame.reshape(-1)
+    flat[:500] = (flat[:500] & ~np.uint8(2 ** bits - 1)) | expected
+    assert bit_errors(frame, expected, bits) == 0
+
+    # One flipped bit in each of 7 symbols, two in one more
+    flat[[0, 10, 20, 30, 40, 50, 60]] ^= 1
+    if bits > 1:
+        flat[70] ^= 0b11
+        assert bit_errors(frame, expected, bits) == 9
+    else:
+        assert bit_errors(frame, expected, bits) == 7
+
+
+def test_bit_errors_on_the_top_left_corner():
+    frame = np.zeros((10, 20, 3), dtype=np.uint8)
+    expected = np.zeros((4, 5, 3), dtype=np.uint8)
+    frame[3, 4, 2] = 1  # Inside the corner
+    frame[4, 0, 0] = 1  # Outside it
+    assert bit_errors(frame, expected, 2) == 1
+
+
+def test_summarize_skips_identical_frames():
+    rows = [{'psnr': math.inf, 'ssim': 1.0, 'bit_errors': None, 'payload_bits': None},
+            {'psnr': 40.0, 'ssim': 0.9, 'bit_errors': 3, 'payload_bits': 300}]
+    summary = summarize(rows)
+    assert summary['identical_frames'] == 1
+    assert summary['psnr_mean'] == 40.0
+    assert summary['ber'] == pytest.approx(0.01)
+
+
+def test_dct_videos_get_no_ber(make_video, tmp_path):
+    cover, stego = make_video(4), str(tmp_path / 'stego.mkv')
+    secret = tmp_path / 'secret.bin'
+    secret.write_bytes(b'hidden in the coefficients')
+    dct.embed_bytes(cover, secret.read_bytes(), stego)
+
+    rows = analyze(cover, stego, secret_path=str(secret))
+    assert len(rows) == 4
+    assert all(row['ber'] is None for row in rows)
+    assert summarize(rows)['ber'] is None
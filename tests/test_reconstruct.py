@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from stego.dct import reconstruct_image
+from tests.reference import reconstruct_image_loop
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_matches_per_pixel_loop(dtype):
+    rng = np.random.default_rng(0)
+    # Spread values past both clip limits so clipping is exercised too
+    block = (rng.random((64, 64)) * 1.4 - 0.2).astype(dtype)
+    assert np.array_equal(reconstruct_image(block), reconstruct_image_loop(block))
+
+
+def test_channel_stack_fills_each_channel():
+    rng = np.random.default_rng(1)
+    stack = rng.random((64, 64, 3)).astype(np.float32)
+    image = reconstruct_image(stack, size=(128, 96))
+    assert image.shape == (128, 96, 3)
+    for channel in range(3):
+        expected = reconstruct_image(stack[:, :, channel], size=(128, 96))[:, :, 0]
+        assert np.array_equal(image[:, :, channel], expected)
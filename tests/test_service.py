@@ -0,0 +1,111 @@
+import asyncio
+import os
+
+import pytest
+
+from stego.cli import run_job
+from stego.pipeline import PipelineCancelled
+from stego.service import JobService
+
+
+def cancel_after(calls):
+    """A progress callback that cancels the job on its `calls`-th call."""
+    seen = []
+
+    def progress(value):
+        seen.append(value)
+        if len(seen) >= calls:
+            raise PipelineCancelled("Operation cancelled")
+    return progress
+
+
+@pytest.fixture
+def note(tmp_path):
+    """A small file for the byte engines; spans a few carrier frames of a 320x240 DCT cover."""
+    path = tmp_path / 'note.bin'
+    path.write_bytes(os.urandom(8000))
+    return str(path)
+
+
+@pytest.fixture
+def stego_videos(make_video, secret_png, note, tmp_path):
+    """A DCT header video, a DCT byte video and an LSB header video of one cover."""
+    cover = make_video(20)
+    videos = {}
+    for name, job in (('dct', dict(method='dct', header=True, secret=secret_png)),
+                      ('dct-bytes', dict(method='dct', binary=True, secret=note)),
+                      ('lsb', dict(method='lsb', header=True, bits_per_channel=1, native=True,
+                                   secret=secret_png))):
+        videos[name] = str(tmp_path / f'{name}.mkv')
+        result = run_job(dict(job, mode='embed', video=cover, output=videos[name]))
+        assert result['status'] == 'ok', result['error']
+    return videos
+
+
+@pytest.mark.parametrize('job', [dict(method='dct', header=True), dict(method='dct', binary=True),
+                                 dict(method='lsb', header=True)])
+def test_embeds_stop_at_the_next_frame(make_video, secret_png, note, tmp_path, job):
+    output = tmp_path / 'stego.mkv'
+    secret = note if job.get('binary') else secret_png
+    job = dict(job, mode='embed', video=make_video(20), secret=secret, output=str(output))
+    assert run_job(job, cancel_after(3))['status'] == 'cancelled'
+    assert not output.exists()
+
+
+# The full-plane DCT image sits in one carrier frame, the others span several
+@pytest.mark.parametrize('name, output, calls', [('dct', 'out.png', 1), ('dct-bytes', 'out.bin', 2),
+                                                 ('lsb', 'out.png', 2)])
+def test_extracts_stop_at_the_next_frame(stego_videos, tmp_path, name, output, calls):
+    output = tmp_path / output
+    job = dict(mode='extract', method=name.split('-')[0], binary=name.endswith('bytes'),
+               video=stego_videos[name], output=str(output))
+    result = run_job(job, cancel_after(calls))
+    assert result['status'] == 'cancelled', result['error']
+    assert not output.exists()
+    assert run_job(job)['status'] == 'ok'
+
+
+def test_cancelled_queued_jobs_free_their_place(tmp_path):
+    async def scenario():
+        # Not started: every job stays queued
+        service = JobService(workers=1, max_queue=2)
+        try:
+            spec = dict(video='in.mkv', secret='s.png', output=str(tmp_path / 'out.mkv'))
+            first, _ = service.submit(dict(spec)), service.submit(dict(spec))
+            with pytest.raises(asyncio.QueueFull):
+                service.submit(dict(spec))
+
+            assert service.cancel(first)
+            assert first.state == 'cancelled'
+            assert service.status()['queue_depth'] == 1
+            service.submit(dict(spec))
+            assert service.status()['queue_depth'] == 2
+            assert not service.cancel(first)
+        finally:
+            service.close()
+
+    asyncio.run(scenario())
+
+
+def test_cancel_a_running_dct_embed(make_video, secret_png, tmp_path):
+    output = tmp_path / 'stego.mkv'
+    cover = make_video(400, size=(640, 480))
+
+    async def scenario():
+        service = JobService(workers=1)
+        await service.start()
+        try:
+            job = service.submit(dict(method='dct', header=True, video=cover, secret=secret_png,
+                                      output=str(output)))
+            while job.progress == 0 and not job.finished:
+                await asyncio.wait_for(job.changed.wait(), 60)
+            assert service.cancel(job)
+            while not job.finished:
+                await asyncio.wait_for(job.changed.wait(), 60)
+            return job.state
+        finally:
+            service.close()
+
+    assert asyncio.run(scenario()) == 'cancelled'
+    assert not output.exists()
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.stego.mkv.')]
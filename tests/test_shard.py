@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+import pytest
+
+from stego import remux
+from stego.frameindex import FrameIndex
+from stego.lsb import Steganography
+from stego.shard import embed_sharded, plan_segments
+
+
+def index_of(frames, gop):
+    return FrameIndex(frames, list(range(0, frames, gop)), [k / 25 for k in range(frames)])
+
+
+@pytest.mark.parametrize('workers', [1, 2, 3, 4, 7])
+def test_segments_start_on_keyframes(workers):
+    index = index_of(100, 10)
+    segments = plan_segments(index, workers)
+    assert len(segments) == workers
+    assert segments[0][0] == 0 and segments[-1][1] == 100
+    assert all(end == start for (_, end), (start, _) in zip(segments, segments[1:]))
+    assert all(start in index.keyframes for start, _ in segments)
+
+
+def test_segments_are_limited_by_the_keyframes():
+    assert plan_segments(index_of(100, 40), 8) == [(0, 40), (40, 80), (80, 100)]
+    assert plan_segments(index_of(30, 30), 4) == [(0, 30)]
+
+
+def test_sharding_needs_ffmpeg(make_video, tmp_path, monkeypatch):
+    monkeypatch.setattr(remux, 'available', lambda: False)
+    with pytest.raises(Exception, match='ffmpeg and ffprobe'):
+        embed_sharded(make_video(2), str(tmp_path / 'out.mkv'), {}, 2, 'ffv1')
+
+
+def read_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            return frames
+        frames.append(frame)
+
+
+@pytest.mark.skipif(not remux.available(), reason="needs ffmpeg and ffprobe")
+@pytest.mark.parametrize('workers', [1, 3])
+def test_sharded_embed_matches_serial(make_video, secret_png, tmp_path, workers):
+    cover = make_video(60)
+    steg = Steganography(frame_size=None)
+    steg.codec = 'ffv1'
+    steg.use_header = True
+    serial, sharded = str(tmp_path / 'serial.mkv'), str(tmp_path / 'sharded.mkv')
+    steg.embed_data(cover, secret_png, serial, lambda value: None)
+    steg.shard_workers = workers
+    steg.embed_data(cover, secret_png, sharded, lambda value: None)
+
+    expected, joined = read_frames(serial), read_frames(sharded)
+    assert len(expected) == len(joined) == 60
+    assert all(np.array_equal(a, b) for a, b in zip(expected, joined))
+
+    steg.shard_workers = None
+    steg.extract_data(sharded, str(tmp_path / 'out.png'), lambda value: None)
+    assert steg.last_checksum_ok